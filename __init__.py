@@ -1,9 +1,57 @@
-from wxlive import Variable, VariableList, make_listener
-from widgets import StaticText, TextCtrl, TextEntry, Slider
-from graph import axes_set_x_variable, axes_set_time_as_x_variable
+import sys
+import types
+from importlib import import_module
 
-del wxlive
-del graph
+from core import Variable, VariableList, BatchWriteError, SampleBuffer, \
+    AdaptiveInterval, WriteQueue, ListenerRegistry, VisibilityTracker, \
+    SelfUpdating, is_shown_on_screen, VISIBILITY_CHECK_INTERVAL, \
+    DROP_OLDEST, DROP_NEWEST, BLOCK
 
-# vim: set filetype=python shiftwidth=2 softtabstop=2 tabstop=8 expandtab: 
+# Everything else is imported from its module when it is first accessed, so
+# that importing wxlive does not import wx or matplotlib. A process that only
+# uses Variables never loads either.
 
+_lazy = {
+    'make_listener': 'wxlive',
+    'StaticText': 'widgets',
+    'TextCtrl': 'widgets',
+    'TextEntry': 'widgets',
+    'Slider': 'widgets',
+    'axes_set_x_variable': 'graph',
+    'axes_set_time_as_x_variable': 'graph',
+    'VariableServer': 'net',
+    'VariableClient': 'net',
+    'RemoteVariable': 'net',
+    'SharedVariableTable': 'shm',
+    'SharedVariable': 'shm',
+    'VariableTable': 'table',
+    'ChannelView': 'table',
+    'RollingMean': 'stats',
+    'RollingStd': 'stats',
+    'RollingMin': 'stats',
+    'RollingMax': 'stats',
+    'ExponentialMean': 'stats',
+    'RealClock': 'clock',
+    'SimulatedClock': 'clock',
+    'get_clock': 'clock',
+    'set_clock': 'clock',
+}
+
+class _LazyModule(types.ModuleType):
+  def __getattr__(self, name):
+    if name not in _lazy:
+      raise AttributeError("'module' object has no attribute '%s'" % name)
+    value = getattr(import_module('.' + _lazy[name], __name__), name)
+    setattr(self, name, value)
+    return value
+
+  def __dir__(self):
+    return sorted(set(self.__dict__) | set(_lazy))
+
+_module = _LazyModule(__name__, __doc__)
+_module.__dict__.update(sys.modules[__name__].__dict__)
+# Keep the original module alive, as its globals are still in use.
+_module._original = sys.modules[__name__]
+sys.modules[__name__] = _module
+
+# vim: set filetype=python shiftwidth=2 softtabstop=2 tabstop=8 expandtab:
@@ -1,8 +1,11 @@
 from matplotlib.axes import Axes
 from wx import EvtHandler
-from wxlive import Variable
-from time import sleep, time
-from threading import Thread
+from core import Variable, VisibilityTracker, is_shown_on_screen, \
+    VISIBILITY_CHECK_INTERVAL
+from threading import Lock
+from collections import deque
+import numpy
+from clock import get_clock
 
 class AxesEvtHandler(EvtHandler):
   '''An event handler so that the axes can appear to work as listeners'''
@@ -13,16 +16,80 @@ class AxesEvtHandler(EvtHandler):
   def on_live_variable_event(self, evt):
     self._axes.update(evt.value)
 
+  def is_shown_on_screen(self):
+    return axes_is_shown_on_screen(self._axes)
+
+class WindowExtent(object):
+  '''The minimum and maximum of a sliding window of values. Values enter the
+  window with append() and leave it with popleft(), and both take amortised
+  constant time, because the candidates for minimum and maximum are kept in
+  monotonic deques.'''
+  def __init__(self):
+    self.clear()
+
+  def clear(self):
+    self._min = deque()
+    self._max = deque()
+    self._start = 0
+    self._end = 0
+
+  def append(self, value):
+    i = self._end
+    self._end += 1
+    if value is None or value != value:
+      return
+    while self._min and self._min[-1][1] >= value:
+      self._min.pop()
+    self._min.append((i, value))
+    while self._max and self._max[-1][1] <= value:
+      self._max.pop()
+    self._max.append((i, value))
+
+  def popleft(self, n=1):
+    self._start = min(self._start + n, self._end)
+    while self._min and self._min[0][0] < self._start:
+      self._min.popleft()
+    while self._max and self._max[0][0] < self._start:
+      self._max.popleft()
+
+  @property
+  def min(self):
+    if self._min:
+      return self._min[0][1]
+    return None
+
+  @property
+  def max(self):
+    if self._max:
+      return self._max[0][1]
+    return None
+
+
 class Plot(object):
+  # Whether the artist is animated, and can be redrawn with blitting.
+  blittable = True
+
   def __init__(self, axes, *args, **kwargs):
+    # Animated lines are left out of full draws of the canvas, and drawn on
+    # top of them by axes_redraw().
+    kwargs['animated'] = True
     self._plot = axes._orig_plot([], [], *args, **kwargs)[0]
     self._x_data = []
     self._y_data = []
+    self._x_extent = WindowExtent()
+    self._y_extent = WindowExtent()
 
   @property
   def plot(self):
     return self._plot
 
+  @property
+  def artist(self):
+    return self._plot
+
+  def is_shown_on_screen(self):
+    return artist_is_shown_on_screen(self._plot)
+
   @property
   def xdata(self):
     return self._x_data
@@ -31,9 +98,25 @@ class Plot(object):
   def ydata(self):
     return self._y_data
 
+  @property
+  def x_extent(self):
+    return self._x_extent
+
+  @property
+  def y_extent(self):
+    return self._y_extent
+
+  def append(self, x, y):
+    self._x_data.append(x)
+    self._y_data.append(y)
+    self._x_extent.append(x)
+    self._y_extent.append(y)
+
   def reset(self):
     self._x_data = []
     self._y_data = []
+    self._x_extent.clear()
+    self._y_extent.clear()
 
     self.update_plot()
 
@@ -43,6 +126,8 @@ class Plot(object):
       dif = dlen - max_points
       self._x_data = self._x_data[dif:]
       self._y_data = self._y_data[dif:]
+      self._x_extent.popleft(dif)
+      self._y_extent.popleft(dif)
 
     self.plot.set_xdata(self._x_data)
     self.plot.set_ydata(self._y_data)
@@ -51,11 +136,12 @@ class Plot(object):
 class VariablePlot(Plot):
   def __init__(self, axes, y_variable, *args, **kwargs):
     Plot.__init__(self, axes, *args, **kwargs)
+    # The plot reads the y_variable itself, without listening to it.
     self._y_variable = y_variable
+    y_variable.add_consumer(self)
 
   def update(self, x, max_points=None):
-    self._x_data.append(x)
-    self._y_data.append(self._y_variable.value)
+    self.append(x, self._y_variable.value)
 
     self.update_plot(max_points)
 
@@ -64,6 +150,398 @@ class VariablePlot(Plot):
     return self._y_variable
 
 
+class SampleHistory(object):
+  '''The timestamped values of a Variable, recorded as the Variable notifies
+  its listeners, including every pushed sample. Recording does not call
+  fget: the Variable must be updated by someone else.
+
+  At most MAX_SAMPLES samples are kept, so that axes without max_points do
+  not resample an ever growing history. The Variable only refers weakly to
+  its history, which is thus forgotten together with its plot.
+
+  Notifications without anything new are recognised by the serial of the
+  Variable and skipped. A sample older than the last one recorded means
+  that the time base changed, e.g. by reset_time_offset(), and starts the
+  history anew.'''
+  MAX_SAMPLES = 10000
+
+  def __init__(self, variable, maxlen=None):
+    if maxlen is None:
+      maxlen = self.MAX_SAMPLES
+    self._variable = variable
+    self._lock = Lock()
+    self._times = deque(maxlen=maxlen)
+    self._values = deque(maxlen=maxlen)
+    self._last_serial = None
+    self._callback = variable.add_weak_callback(self.record)
+    if variable.get_time() is not None:
+      self.record(variable.get_time(), variable._value, None)
+
+  def record(self, time, value, samples):
+    serial = self._variable._serial
+    if serial == self._last_serial:
+      return
+    self._last_serial = serial
+    if samples is None:
+      samples = [(time, value)]
+    with self._lock:
+      for t, v in samples:
+        if t is None or v is None:
+          continue
+        if self._times and t < self._times[-1]:
+          self._times.clear()
+          self._values.clear()
+        self._times.append(float(t))
+        self._values.append(float(v))
+
+  def arrays(self):
+    '''Return the times and values as arrays.'''
+    with self._lock:
+      return numpy.array(self._times), numpy.array(self._values)
+
+  def keep_last(self, n):
+    '''Forget all but the last n samples.'''
+    with self._lock:
+      while len(self._times) > n:
+        self._times.popleft()
+        self._values.popleft()
+
+  def keep_from(self, t):
+    '''Forget the samples before time t, except for the last one of them,
+    which is still needed to interpolate at time t.'''
+    with self._lock:
+      while len(self._times) > 1 and self._times[1] <= t:
+        self._times.popleft()
+        self._values.popleft()
+
+  def detach(self):
+    self._variable.remove_callback(self._callback)
+
+
+class AlignedVariablePlot(Plot):
+  '''A plot of a y Variable against the x Variable of the axes, where x and
+  y are paired by their timestamps instead of by the moment of plotting.
+  Both Variables keep a SampleHistory, and at every update the y values are
+  interpolated at the times of the x values in one vectorized step.'''
+  def __init__(self, axes, y_variable, *args, **kwargs):
+    Plot.__init__(self, axes, *args, **kwargs)
+    self._y_variable = y_variable
+    self._history = SampleHistory(y_variable)
+    y_variable.add_consumer(self)
+
+  @property
+  def y_variable(self):
+    return self._y_variable
+
+  @property
+  def history(self):
+    return self._history
+
+  def reset(self):
+    self._history.keep_last(0)
+    Plot.reset(self)
+
+  def resample(self, x_times, x_values):
+    if len(x_times):
+      self._history.keep_from(x_times[0])
+    y_times, y_values = self._history.arrays()
+    if len(y_times):
+      y = numpy.interp(x_times, y_times, y_values,
+          left=numpy.nan, right=numpy.nan)
+    else:
+      y = numpy.empty(len(x_times))
+      y.fill(numpy.nan)
+
+    self._x_data = list(x_values)
+    self._y_data = list(y)
+    self._x_extent.clear()
+    self._y_extent.clear()
+    for xi, yi in zip(self._x_data, self._y_data):
+      self._x_extent.append(xi)
+      self._y_extent.append(yi)
+    self.update_plot()
+
+
+class ImagePlot(object):
+  '''A live image of the most recent rows of an array-valued Variable, such
+  as a spectrum per update, i.e. a waterfall or spectrogram.
+
+  The rows are kept in a preallocated ring buffer of twice the number of
+  rows, where every row is written twice. The rows in time order are then
+  always a contiguous slice of the buffer, so updating the image needs
+  neither reallocation nor copying on our side. The image is animated, so
+  that axes that only contain ImagePlots are redrawn by blitting.
+
+  Colour limits that are not given with vmin and vmax (or a norm) follow the
+  rows: they are widened to include every row that arrives.
+
+  Rows are recorded as the Variable notifies them, one per new value or
+  pushed sample, like the samples of a HistogramPlot, and the image only
+  shows them when the axes update. A Variable that is not active is updated
+  by the axes, as for other plots.'''
+  blittable = True
+
+  def __init__(self, axes, variable, rows, width=None, **kwargs):
+    if width is None:
+      width = len(variable.value)
+    self._variable = variable
+    self._rows = rows
+    self._buffer = numpy.empty((2 * rows, width))
+    self._buffer.fill(numpy.nan)
+    self._head = 0
+    self._x_extent = WindowExtent()
+    self._y_extent = WindowExtent()
+    if kwargs.get('norm') is not None:
+      self._clim = None
+    else:
+      self._clim = (kwargs.get('vmin'), kwargs.get('vmax'))
+    self._low = None
+    self._high = None
+    self._scaled = False
+    self._last_serial = None
+    self._lock = Lock()
+
+    kwargs.setdefault('aspect', 'auto')
+    kwargs.setdefault('interpolation', 'nearest')
+    kwargs['animated'] = True
+    self._image = axes._orig_imshow(self.data, **kwargs)
+    self._callback = variable.add_weak_callback(self.record)
+    variable.add_consumer(self)
+    if variable._value is not None:
+      self.record(variable.get_time(), variable._value, None)
+
+  @property
+  def image(self):
+    return self._image
+
+  @property
+  def artist(self):
+    return self._image
+
+  def is_shown_on_screen(self):
+    return artist_is_shown_on_screen(self._image)
+
+  @property
+  def variable(self):
+    return self._variable
+
+  @property
+  def data(self):
+    '''The rows in the buffer, oldest first.'''
+    return self._buffer[self._head:self._head+self._rows]
+
+  @property
+  def x_extent(self):
+    return self._x_extent
+
+  @property
+  def y_extent(self):
+    return self._y_extent
+
+  def append(self, row):
+    h = self._head
+    self._buffer[h] = row
+    self._buffer[h + self._rows] = row
+    self._head = (h + 1) % self._rows
+
+  def rescale(self, row):
+    '''Widen the colour limits that were not given to include row. The
+    image takes the new limits at the next update().'''
+    if self._clim is None or None not in self._clim:
+      return
+    row = numpy.asarray(row, dtype=float)
+    row = row[numpy.isfinite(row)]
+    if not len(row):
+      return
+    low, high = row.min(), row.max()
+    if self._low is not None and self._low <= low and high <= self._high:
+      return
+    if self._low is not None:
+      low = min(low, self._low)
+      high = max(high, self._high)
+    self._low, self._high = low, high
+    self._scaled = True
+
+  def record(self, time, value, samples):
+    serial = self._variable._serial
+    if serial == self._last_serial:
+      return
+    self._last_serial = serial
+    if samples is None:
+      samples = [(time, value)]
+    with self._lock:
+      for t, row in samples:
+        if row is not None:
+          self.append(row)
+          self.rescale(row)
+
+  def detach(self):
+    self._variable.remove_callback(self._callback)
+    self._variable.remove_consumer(self)
+
+  def reset(self):
+    with self._lock:
+      self._buffer.fill(numpy.nan)
+      self._head = 0
+      self._low = None
+      self._high = None
+      self._image.set_data(self.data)
+
+  def update(self, x, max_points=None):
+    if not self._variable.is_active():
+      self._variable.update()
+    with self._lock:
+      self._image.set_data(self.data)
+      if self._scaled:
+        vmin, vmax = self._clim
+        self._image.set_clim(self._low if vmin is None else vmin,
+            self._high if vmax is None else vmax)
+        self._scaled = False
+
+
+class HistogramPlot(object):
+  '''A live histogram of the values of a Variable, drawn as a step line.
+
+  Every value the Variable notifies, including every pushed sample, goes
+  into its bin in constant time as it arrives, while the line is only
+  updated when the axes update. Old values can be forgotten in two ways:
+  with decay, the weight of all earlier values is multiplied by decay for
+  every new value (done in constant time by growing the weight of new
+  values instead); with window, only the last window values count. Values
+  outside the range are not counted, but still take part in the decay and
+  take a place in the window.
+
+  Like SampleHistory, a HistogramPlot skips notifications without anything
+  new by the serial of its Variable, and is only referred to weakly by the
+  Variable.'''
+  blittable = True
+
+  # Weight at which the counts are renormalised when forgetting with decay.
+  MAX_WEIGHT = 1e100
+
+  def __init__(self, axes, variable, bins, range, decay=None, window=None,
+      **kwargs):
+    if decay is not None and window is not None:
+      raise ValueError('Give either a decay or a window, not both.')
+    if decay is not None and not 0 < decay <= 1:
+      raise ValueError('Decay must be between 0 and 1.')
+    self._variable = variable
+    self._bins = int(bins)
+    self._low, self._high = float(range[0]), float(range[1])
+    self._scale = self._bins / (self._high - self._low)
+    self._decay = decay
+    self._window = None
+    if window is not None:
+      self._window = deque(maxlen=int(window))
+    self._counts = numpy.zeros(self._bins)
+    self._weight = 1.0
+    self._last_serial = None
+    self._lock = Lock()
+
+    self._edges = numpy.linspace(self._low, self._high, self._bins + 1)
+    self._heights = numpy.zeros(self._bins + 1)
+    self._x_extent = WindowExtent()
+    self._y_extent = WindowExtent()
+    self._x_extent.append(self._low)
+    self._x_extent.append(self._high)
+
+    kwargs.setdefault('drawstyle', 'steps-post')
+    kwargs['animated'] = True
+    self._plot = axes._orig_plot(self._edges, self._heights, **kwargs)[0]
+    self._callback = variable.add_weak_callback(self.record)
+    variable.add_consumer(self)
+    if variable._value is not None:
+      self.record(variable.get_time(), variable._value, None)
+
+  @property
+  def plot(self):
+    return self._plot
+
+  @property
+  def artist(self):
+    return self._plot
+
+  def is_shown_on_screen(self):
+    return artist_is_shown_on_screen(self._plot)
+
+  @property
+  def variable(self):
+    return self._variable
+
+  @property
+  def edges(self):
+    return self._edges
+
+  @property
+  def counts(self):
+    '''The (weighted) number of values in every bin.'''
+    with self._lock:
+      return self._counts / self._weight
+
+  @property
+  def x_extent(self):
+    return self._x_extent
+
+  @property
+  def y_extent(self):
+    return self._y_extent
+
+  def add(self, value):
+    if self._low <= value < self._high:
+      i = min(int((value - self._low) * self._scale), self._bins - 1)
+    elif value == self._high:
+      i = self._bins - 1
+    else:
+      i = None
+
+    with self._lock:
+      if self._window is not None:
+        if len(self._window) == self._window.maxlen and \
+            self._window[0] is not None:
+          self._counts[self._window[0]] -= 1
+        self._window.append(i)
+        if i is not None:
+          self._counts[i] += 1
+      elif self._decay is not None:
+        self._weight /= self._decay
+        if self._weight > self.MAX_WEIGHT:
+          self._counts /= self._weight
+          self._weight = 1.0
+        if i is not None:
+          self._counts[i] += self._weight
+      elif i is not None:
+        self._counts[i] += 1
+
+  def record(self, time, value, samples):
+    serial = self._variable._serial
+    if serial == self._last_serial:
+      return
+    self._last_serial = serial
+    if samples is None:
+      samples = [(time, value)]
+    for t, v in samples:
+      if v is not None and v == v:
+        self.add(float(v))
+
+  def detach(self):
+    self._variable.remove_callback(self._callback)
+    self._variable.remove_consumer(self)
+
+  def reset(self):
+    with self._lock:
+      self._counts.fill(0)
+      self._weight = 1.0
+      if self._window is not None:
+        self._window.clear()
+    self.update(None)
+
+  def update(self, x, max_points=None):
+    self._heights[:-1] = self.counts
+    self._heights[-1] = self._heights[-2]
+    self._plot.set_ydata(self._heights)
+    self._y_extent.clear()
+    self._y_extent.append(0.0)
+    self._y_extent.append(self._heights.max())
 
 
 def find_next_plot(args, start, was_var):
@@ -89,7 +567,7 @@ def axes_plot(axes, *args, **kwargs):
     if isinstance(args[i], Variable):
       j = find_next_plot(args, i, True)
       if j > i:
-        p = VariablePlot(axes, *args[i:j], **kwargs)
+        p = axes._plot_class(axes, *args[i:j], **kwargs)
         axes._plots[args[i]] = p
         result.append(p.plot)
         i = j
@@ -102,6 +580,122 @@ def axes_plot(axes, *args, **kwargs):
       i = j
   return result
 
+def autoscale_bounds(bounds, low, high, margin, shrink):
+  '''Return new bounds for data between low and high, or None if the current
+  bounds can stay. The bounds change when the data leaves them, or when they
+  are more than shrink times as wide as the data plus margins.'''
+  if low is None:
+    return None
+  span = high - low
+  if span == 0:
+    span = abs(high) or 1.0
+  pad = margin * span
+  lower, upper = bounds
+  if lower <= low and high <= upper and \
+      upper - lower <= shrink * (span + 2 * pad):
+    return None
+  return (low - pad, high + pad)
+
+def axes_set_live_autoscale(axes, enable=True, margin=0.1, shrink=2.0):
+  '''Let the axes adapt their bounds to the data of the live plots, using the
+  running minimum and maximum of every plot instead of matplotlib's
+  autoscaling over all data. The bounds get a margin (a fraction of the
+  data range) on both sides, and only change when the data leaves them or
+  takes up less than 1/shrink of them, so that changes stay rare.'''
+  if enable:
+    axes._live_autoscale = (float(margin), float(shrink))
+    axes.set_autoscale_on(False)
+  else:
+    axes._live_autoscale = None
+
+def axes_live_autoscale(axes):
+  '''Apply the live autoscaling, if enabled. Returns True if the bounds of
+  the axes changed.'''
+  if axes._live_autoscale is None:
+    return False
+  margin, shrink = axes._live_autoscale
+
+  changed = False
+  for extent, get_bound, set_bound in (
+      ('x_extent', axes.get_xbound, axes.set_xbound),
+      ('y_extent', axes.get_ybound, axes.set_ybound)):
+    low = high = None
+    for plot in axes._plots.values():
+      e = getattr(plot, extent)
+      if e.min is not None:
+        if low is None or e.min < low:
+          low = e.min
+        if high is None or e.max > high:
+          high = e.max
+    bounds = autoscale_bounds(get_bound(), low, high, margin, shrink)
+    if bounds is not None:
+      set_bound(*bounds)
+      changed = True
+  return changed
+
+def axes_waterfall(axes, variable, rows, width=None, **kwargs):
+  '''Show the last rows values of an array-valued wxlive.Variable as an
+  image, one row per update. If width is not given, it is the length of the
+  current value of the variable. Other keyword arguments are passed to
+  matplotlib.axes.Axes.imshow. Returns the image.'''
+  p = ImagePlot(axes, variable, rows, width, **kwargs)
+  axes._plots[variable] = p
+  return p.image
+
+def axes_histogram(axes, variable, bins, range, decay=None, window=None,
+    **kwargs):
+  '''Show a live histogram of the values of a wxlive.Variable, with bins
+  equal bins between range[0] and range[1]. See HistogramPlot for decay and
+  window. Other keyword arguments are passed to matplotlib.axes.Axes.plot.
+  Returns the step line.'''
+  p = HistogramPlot(axes, variable, bins, range, decay, window, **kwargs)
+  axes._plots[variable] = p
+  return p.plot
+
+def axes_capture_background(axes, event=None):
+  '''Remember the canvas without the animated artists, to blit onto.'''
+  canvas = axes.figure.canvas
+  if hasattr(canvas, 'copy_from_bbox'):
+    axes._blit_background = canvas.copy_from_bbox(axes.bbox)
+  else:
+    axes._blit_background = None
+
+def axes_redraw(axes):
+  '''Redraw the axes after the live plots were updated. If all live plots
+  are animated, only those are redrawn and blitted onto the rest of the
+  canvas, unless the bounds of the axes changed. Otherwise the whole canvas
+  is drawn, and the animated plots, which a full draw leaves out, are drawn
+  on top of it.'''
+  changed = axes_live_autoscale(axes)
+  canvas = axes.figure.canvas
+  plots = list(axes._plots.values())
+  can_blit = hasattr(canvas, 'copy_from_bbox')
+  blit = plots and all(p.blittable for p in plots) and can_blit
+
+  if blit and axes._blit_canvas is not canvas:
+    # Every full draw, e.g. after resizing, invalidates the background.
+    canvas.mpl_connect('draw_event',
+        lambda event: axes_capture_background(axes, event))
+    axes._blit_canvas = canvas
+    axes._blit_background = None
+
+  if blit and not changed and axes._blit_background is not None:
+    canvas.restore_region(axes._blit_background)
+    for p in plots:
+      axes.draw_artist(p.artist)
+    canvas.blit(axes.bbox)
+  else:
+    if not can_blit:
+      # Without blitting, animated artists would never be drawn.
+      for p in plots:
+        p.artist.set_animated(False)
+    canvas.draw()
+    animated = [p for p in plots if p.artist.get_animated()]
+    if animated:
+      for p in animated:
+        axes.draw_artist(p.artist)
+      canvas.blit(axes.bbox)
+
 def axes_reset_plots(axes):
   for plot in axes._plots.itervalues():
     plot.reset()
@@ -109,31 +703,83 @@ def axes_reset_plots(axes):
 
 def make_axes_live(axes):
   axes._plots = {}
+  axes._plot_class = VariablePlot
   axes.max_points = None
+  axes._live_autoscale = None
+  axes._blit_canvas = None
+  axes._blit_background = None
 
   method = type(axes.plot)
   axes._orig_plot = axes.plot
+  axes._orig_imshow = axes.imshow
   axes.plot = method(axes_plot, axes, Axes)
+  axes.waterfall = method(axes_waterfall, axes, Axes)
+  axes.histogram = method(axes_histogram, axes, Axes)
   axes.reset_plots = method(axes_reset_plots, axes, Axes)
+  axes.set_live_autoscale = method(axes_set_live_autoscale, axes, Axes)
+  axes.is_shown_on_screen = method(axes_is_shown_on_screen, axes, Axes)
 
   return axes
 
 def axes_update(axes, x):
   for plot in axes._plots.itervalues():
     plot.update(x, axes.max_points)
-  axes.figure.canvas.draw()
+  axes_redraw(axes)
+
+def axes_aligned_update(axes, x=None):
+  '''Update the plots of axes in aligned mode (see
+  graph.axes_set_x_variable). The argument x is ignored: the x values come
+  from the SampleHistory of the x variable.'''
+  if axes.max_points:
+    axes._x_history.keep_last(axes.max_points)
+  x_times, x_values = axes._x_history.arrays()
+  for plot in axes._plots.values():
+    if isinstance(plot, AlignedVariablePlot):
+      plot.resample(x_times, x_values)
+    elif len(x_values):
+      plot.update(x_values[-1], axes.max_points)
+  axes_redraw(axes)
 
 def axes_self_updating_update(axes):
   x = axes._x_variable.value
   for plot in axes._plots.itervalues():
     plot.update(x, axes.max_points)
-  axes.figure.canvas.draw()
+  axes_redraw(axes)
+
+def axes_is_shown_on_screen(axes):
+  '''Returns True if the canvas of the axes is shown on screen.'''
+  canvas = axes.figure.canvas
+  return canvas is not None and is_shown_on_screen(canvas)
+
+def artist_is_shown_on_screen(artist):
+  '''Returns True if the artist is on axes whose canvas is shown on
+  screen. Plots use this to tell the Variables they read whether they are
+  seen (see wxlive.Variable.add_consumer).'''
+  return artist.axes is not None and axes_is_shown_on_screen(artist.axes)
+
+def axes_self_updating_is_visible(axes):
+  return axes.hidden_interval is None or axes._visibility.is_visible()
+
+def axes_self_updating_poll(axes):
+  '''Update the axes, unless its canvas is hidden. See wxlive.Variable.poll()
+  for the meaning of the hidden_interval attribute of the axes.'''
+  if axes.hidden_interval is not None:
+    axes._visibility.request_check()
+    if not axes._visibility.is_visible():
+      if axes.hidden_interval <= 0 or (axes._last_poll is not None and
+          get_clock().time() - axes._last_poll < axes.hidden_interval):
+        return False
+  axes._last_poll = get_clock().time()
+  axes.update()
+  return True
 
 def axes_self_updating_run(axes):
   while axes._continue:
-    axes.update()
-    if axes._interval:
-      sleep(axes._interval)
+    axes.poll()
+    if not axes.is_visible():
+      axes._visibility.wait(VISIBILITY_CHECK_INTERVAL)
+    elif axes._interval:
+      get_clock().sleep(axes._interval)
 
 def axes_self_updating_is_active(axes):
   return axes._thread is not None
@@ -144,12 +790,12 @@ def axes_self_updating_start(axes, interval = None):
 
   if not axes.is_active():
     axes._continue = True
-    axes._thread = Thread(target=axes._run)
-    axes._thread.start()
+    axes._thread = get_clock().start_thread(axes._run)
 
 def axes_self_updating_stop(axes):
   if axes._thread:
     axes._continue = False
+    get_clock().wake(axes._thread)
     axes._thread.join()
     axes._thread = None
 
@@ -167,6 +813,9 @@ def make_axes_self_updating(axes, interval):
   axes._interval = float(interval)
   axes._thread = None
   axes._continue = False
+  axes._last_poll = None
+  axes._visibility = VisibilityTracker((axes,))
+  axes.hidden_interval = None
 
   method = type(axes.plot)
   axes.start = method(axes_self_updating_start, axes,
@@ -177,12 +826,16 @@ def make_axes_self_updating(axes, interval):
       Axes)
   axes._run = method(axes_self_updating_run, axes,
       Axes)
+  axes.poll = method(axes_self_updating_poll, axes,
+      Axes)
+  axes.is_visible = method(axes_self_updating_is_visible, axes,
+      Axes)
 
   return axes
 
 def axes_set_time_offset(axes, value):
   if value == 'now':
-    value = time()
+    value = get_clock().time()
   elif type(value) != float and type(value) != int:
     raise TypeError('Interval can only be a real number.')
 
@@ -197,10 +850,10 @@ def axes_reset_time_offset(axes, value=None):
   axes.set_time_offset(value)
 
 def axes_time_update(axes):
-  t = time() - axes._time_offset
+  t = get_clock().time() - axes._time_offset
   for plot in axes._plots.itervalues():
     plot.update(t, axes.max_points)
-  axes.figure.canvas.draw()
+  axes_redraw(axes)
 
 
 # vim: set filetype=python shiftwidth=2 softtabstop=2 tabstop=8 expandtab: 
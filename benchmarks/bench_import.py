@@ -0,0 +1,72 @@
+#!/bin/env python
+
+# Benchmark of the time it takes to import wxlive, and a guard against
+# regressions: importing wxlive and using Variables must not import wx or
+# matplotlib. Exits with status 1 if it does, or if importing takes longer
+# than the limit (in seconds) given as the first argument.
+#
+# Every measurement runs in a fresh interpreter, so that nothing is cached
+# in sys.modules.
+
+import sys
+import subprocess
+
+RUNS = 5
+
+CORE = '''
+import sys
+from time import time
+start = time()
+import wxlive
+v = wxlive.Variable(float, None, fget=lambda: 1.0)
+v.update()
+print(time() - start)
+print(int('wx' in sys.modules or 'matplotlib' in sys.modules))
+'''
+
+GUI = '''
+from time import time
+start = time()
+import wxlive
+wxlive.StaticText
+wxlive.axes_set_x_variable
+print(time() - start)
+print(0)
+'''
+
+def measure(code):
+  best = None
+  heavy = False
+  for i in range(RUNS):
+    out = subprocess.check_output([sys.executable, '-c', code])
+    seconds, loaded = out.split()
+    seconds = float(seconds)
+    heavy = heavy or loaded == b'1'
+    if best is None or seconds < best:
+      best = seconds
+  return best, heavy
+
+def main():
+  limit = None
+  if len(sys.argv) > 1:
+    limit = float(sys.argv[1])
+
+  core, heavy = measure(CORE)
+  print('%-28s %8.1f ms' % ('import wxlive + Variable', 1e3 * core))
+  try:
+    gui = measure(GUI)[0]
+    print('%-28s %8.1f ms' % ('import wxlive + widgets/axes', 1e3 * gui))
+  except subprocess.CalledProcessError:
+    print('%-28s %11s' % ('import wxlive + widgets/axes', 'failed'))
+
+  failed = False
+  if heavy:
+    print('FAIL: using Variables imported wx or matplotlib')
+    failed = True
+  if limit is not None and core > limit:
+    print('FAIL: import took longer than %.1f ms' % (1e3 * limit))
+    failed = True
+  sys.exit(1 if failed else 0)
+
+if __name__ == '__main__':
+  main()
@@ -0,0 +1,51 @@
+#!/bin/env python
+
+# Benchmark of wxlive.Variable.notify_listeners() while listeners come and go.
+#
+# Many Variables share a pool of listeners. Between rounds of notifications a
+# part of the listeners is removed and replaced by new ones. With a registry
+# that handles changes in constant time, the cost per notification should
+# only depend on the number of listeners, not on the amount of churn.
+
+import wx
+import wxlive
+from time import time
+
+VARIABLES = 1000
+LISTENERS = 20
+ROUNDS = 10
+CHURN = 5
+
+def main():
+  app = wx.App(False)
+
+  variables = [wxlive.Variable(float, 0.0) for i in range(VARIABLES)]
+  listeners = [[wx.EvtHandler() for j in range(LISTENERS)]
+      for i in range(VARIABLES)]
+  for v, ls in zip(variables, listeners):
+    for l in ls:
+      v.add_listener(l, lambda evt: None)
+  app.ProcessPendingEvents()
+
+  print('%6s %14s %14s' % ('round', 'churn (us)', 'notify (us)'))
+  for r in range(ROUNDS):
+    start = time()
+    for v, ls in zip(variables, listeners):
+      for j in range(CHURN):
+        v.remove_listener(ls.pop(0))
+        l = wx.EvtHandler()
+        v.add_listener(l, lambda evt: None)
+        ls.append(l)
+    churn = time() - start
+
+    start = time()
+    for v in variables:
+      v.notify_listeners()
+    notify = time() - start
+    app.ProcessPendingEvents()
+
+    print('%6d %14.2f %14.2f' % (r, 1e6 * churn / (VARIABLES * CHURN),
+        1e6 * notify / VARIABLES))
+
+if __name__ == '__main__':
+  main()
@@ -0,0 +1,261 @@
+#!/bin/env python
+
+# Soak test of wxlive under churn of Variables, VariableLists and axes.
+#
+# Every cycle runs one or more churn modes (see -m), lets everything run for
+# a while, and then reports the number of threads, the resident memory, the
+# memory allocated by Python (if tracemalloc is available) and the number of
+# events that were posted to listeners but not handled.
+#
+#   teardown   Variables with listeners, a VariableList and self-updating
+#              axes are created every cycle, and stopped and removed
+#              explicitly afterwards.
+#   drop       The same, but everything is dropped while it is still
+#              running, without stop() or remove_listener().
+#   destroy    Long-lived Variables get new wx.Window listeners every cycle,
+#              which are destroyed without remove_listener(). This needs a
+#              display, e.g. run with xvfb-run.
+#   unbounded  Long-lived self-updating axes with max_points None.
+#
+# The first cycles are taken as warm-up. If any of the measures has grown
+# beyond its threshold at the end compared to the end of the warm-up, the
+# script exits with status 1. Leaked threads may still be running at that
+# point, so the script ends with os._exit().
+
+import gc
+import os
+import sys
+import threading
+from optparse import OptionParser
+from time import time, sleep
+
+import wx
+import wxlive
+import matplotlib
+matplotlib.use('Agg')
+from matplotlib.figure import Figure
+from matplotlib.backends.backend_agg import FigureCanvasAgg
+
+try:
+  import tracemalloc
+except ImportError:
+  tracemalloc = None
+
+MODES = ('teardown', 'drop', 'destroy', 'unbounded')
+
+CYCLES = 30
+WARMUP = 5
+VARIABLES = 200
+LISTENERS = 3
+AXES = 10
+PLOTS = 4
+MAX_POINTS = 100
+INTERVAL = 0.01
+RUN_TIME = 0.2
+
+THREAD_GROWTH = 0
+RSS_GROWTH = 20.0
+TRACED_GROWTH = 5.0
+PENDING_EVENTS = 0
+
+
+class Counter(object):
+  def __init__(self):
+    self.posted = 0
+    self.handled = 0
+    self.lock = threading.Lock()
+
+  def expect(self, events):
+    with self.lock:
+      self.posted += events
+
+  def on_notify(self, variable):
+    # Variable callbacks are called once for every notification, which posts
+    # one event to each of the listeners. The callback must not hold the
+    # Variable, or the cycle would keep dropped Variables alive.
+    listeners = variable._listeners
+    def callback(time, value, samples):
+      self.expect(len(listeners))
+    return callback
+
+  def on_event(self, evt):
+    with self.lock:
+      self.handled += 1
+
+  @property
+  def pending(self):
+    return self.posted - self.handled
+
+
+def rss():
+  '''Return the resident memory of the process in MB.'''
+  try:
+    with open('/proc/self/statm') as f:
+      pages = int(f.read().split()[1])
+    import resource
+    return pages * resource.getpagesize() / 1048576.0
+  except (IOError, OSError, ImportError):
+    import resource
+    # The maximum instead of the current value, in kB on Linux.
+    return resource.getrusage(resource.RUSAGE_SELF).ru_maxrss / 1024.0
+
+def traced():
+  '''Return the memory allocated by Python in MB, or None.'''
+  if tracemalloc is None:
+    return None
+  return tracemalloc.get_traced_memory()[0] / 1048576.0
+
+def fget():
+  return time() % 1.0
+
+def make_variables(counter):
+  variables = []
+  for i in range(VARIABLES):
+    v = wxlive.Variable(float, 0.0, fget=fget)
+    v.add_callback(counter.on_notify(v))
+    variables.append(v)
+  return variables
+
+def listen(variables, counter, make_listener):
+  listeners = []
+  for v in variables:
+    for j in range(LISTENERS):
+      l = make_listener()
+      v.add_listener(l, counter.on_event)
+      # Adding a listener posts the current value to it.
+      counter.expect(1)
+      listeners.append(l)
+  return listeners
+
+def start(variables):
+  # Half of the Variables update on their own, the other half in a list.
+  vlist = wxlive.VariableList(INTERVAL)
+  vlist.extend(variables[VARIABLES // 2:])
+  for v in variables[:VARIABLES // 2]:
+    v.start(INTERVAL)
+  vlist.start()
+  return vlist
+
+def make_axes(variables, max_points):
+  figures = []
+  for i in range(AXES):
+    figure = Figure((2, 2), dpi=50)
+    FigureCanvasAgg(figure)
+    axes = figure.add_subplot(111)
+    wxlive.axes_set_time_as_x_variable(axes, INTERVAL, 'now')
+    axes.max_points = max_points
+    for j in range(PLOTS):
+      axes.plot(variables[(i * PLOTS + j) % VARIABLES])
+    axes.start()
+    figures.append(figure)
+  return figures
+
+def run(app):
+  end = time() + RUN_TIME
+  while time() < end:
+    app.ProcessPendingEvents()
+    sleep(INTERVAL)
+
+def cycle_teardown(app, counter, state):
+  variables = make_variables(counter)
+  listeners = listen(variables, counter, wx.EvtHandler)
+  vlist = start(variables)
+  figures = make_axes(variables, MAX_POINTS)
+  run(app)
+
+  for figure in figures:
+    for axes in figure.axes:
+      axes.stop()
+  vlist.stop()
+  for v in variables:
+    v.stop()
+  for v in variables:
+    for l in listeners[:LISTENERS]:
+      v.remove_listener(l)
+    del listeners[:LISTENERS]
+  # Let the events that were posted before stopping come in.
+  app.ProcessPendingEvents()
+
+def cycle_drop(app, counter, state):
+  variables = make_variables(counter)
+  listen(variables, counter, wx.EvtHandler)
+  start(variables)
+  make_axes(variables, MAX_POINTS)
+  run(app)
+  app.ProcessPendingEvents()
+
+def cycle_destroy(app, counter, state):
+  if 'destroy' not in state:
+    variables = make_variables(counter)
+    state['destroy'] = (variables, start(variables))
+  variables = state['destroy'][0]
+
+  frame = wx.Frame(None)
+  listeners = listen(variables, counter, lambda: wx.Window(frame))
+  run(app)
+  app.ProcessPendingEvents()
+  for l in listeners:
+    l.Destroy()
+  frame.Destroy()
+  app.ProcessPendingEvents()
+  app.ProcessIdle()
+
+def cycle_unbounded(app, counter, state):
+  if 'unbounded' not in state:
+    variables = make_variables(counter)
+    state['unbounded'] = (variables, start(variables),
+        make_axes(variables, None))
+  run(app)
+  app.ProcessPendingEvents()
+
+def main():
+  parser = OptionParser()
+  parser.add_option('-c', '--cycles', type='int', default=CYCLES)
+  parser.add_option('-w', '--warmup', type='int', default=WARMUP)
+  parser.add_option('-m', '--mode', action='append', choices=MODES,
+      help='churn mode, may be given more than once (default: all)')
+  options, args = parser.parse_args()
+  modes = options.mode or MODES
+
+  app = wx.App(False)
+  counter = Counter()
+  state = {}
+  if tracemalloc is not None:
+    tracemalloc.start()
+
+  print('modes: ' + ', '.join(modes))
+  print('%6s %8s %10s %12s %8s' % ('cycle', 'threads', 'rss (MB)',
+      'traced (MB)', 'pending'))
+  baseline = None
+  for c in range(options.cycles):
+    for mode in modes:
+      globals()['cycle_' + mode](app, counter, state)
+    gc.collect()
+    app.ProcessPendingEvents()
+    measures = (threading.active_count(), rss(), traced(), counter.pending)
+    print('%6d %8d %10.1f %12s %8d' % (c, measures[0], measures[1],
+        '-' if measures[2] is None else '%.2f' % measures[2], measures[3]))
+    if c == options.warmup - 1 or baseline is None:
+      baseline = measures
+
+  failures = []
+  if measures[0] - baseline[0] > THREAD_GROWTH:
+    failures.append('threads grew by %d' % (measures[0] - baseline[0]))
+  if measures[1] - baseline[1] > RSS_GROWTH:
+    failures.append('resident memory grew by %.1f MB' %
+        (measures[1] - baseline[1]))
+  if measures[2] is not None and measures[2] - baseline[2] > TRACED_GROWTH:
+    failures.append('traced memory grew by %.2f MB' %
+        (measures[2] - baseline[2]))
+  if measures[3] > PENDING_EVENTS:
+    failures.append('%d events were never handled' % measures[3])
+
+  for failure in failures:
+    print('FAIL: ' + failure)
+  if not failures:
+    print('OK')
+  sys.stdout.flush()
+  os._exit(1 if failures else 0)
+
+if __name__ == '__main__':
+  main()
@@ -0,0 +1,209 @@
+
+import heapq
+import itertools
+import time as _time
+from threading import Condition, Thread, current_thread
+
+# All timestamps and all waiting between automatic updates in wxlive go
+# through the clock returned by get_clock(). By default this is a RealClock;
+# installing a SimulatedClock with set_clock() lets hours of live behaviour
+# run in seconds, with the same timestamps on every run.
+
+
+class RealClock(object):
+  '''
+  The clock of the wall: time() and sleep() are those of the time module.
+  '''
+  def time(self):
+    '''
+    time()
+
+    Return the current time in seconds since the epoch.
+    '''
+    return _time.time()
+
+  def sleep(self, seconds):
+    '''
+    sleep(seconds)
+
+    Let the calling thread sleep for the given number of seconds.
+    '''
+    _time.sleep(seconds)
+
+  def wait(self, event, timeout):
+    '''
+    wait(event, timeout)
+
+    Wait at most timeout seconds for a threading.Event to be set. Returns
+    True if it is set.
+    '''
+    return event.wait(timeout)
+
+  def start_thread(self, target):
+    '''
+    start_thread(target)
+
+    Start and return a thread that runs target, for a loop that waits with
+    this clock.
+    '''
+    thread = Thread(target=target)
+    thread.start()
+    return thread
+
+  def wake(self, thread):
+    '''
+    wake(thread)
+
+    Let a thread that sleeps on this clock wake up early, e.g. so that it
+    can be stopped. A RealClock always wakes threads up in due time, so this
+    does nothing.
+    '''
+    pass
+
+
+class SimulatedClock(RealClock):
+  '''
+  A clock whose time only moves when advance() or run_until() is called.
+
+  Threads started with start_thread() are tracked by the clock. Moving time
+  forward wakes the sleeping threads one at a time, in order of their
+  wake-up time, with the clock set to that time, and waits until the woken
+  thread sleeps again (or ends) before going on. Every thread thus sees
+  exactly the same times on every run, and long runs take only as long as
+  the work done in them.
+  '''
+  def __init__(self, start = 0.0, timeout = 10.0):
+    '''
+    wxlive.SimulatedClock(start = 0.0, timeout = 10.0)
+
+    Construct a SimulatedClock at time start. If a woken thread does not
+    sleep again within timeout seconds of real time, moving time forward
+    fails with a RuntimeError.
+    '''
+    self._now = float(start)
+    self.timeout = timeout
+    self._condition = Condition()
+    self._sleepers = []
+    self._order = itertools.count()
+    self._awake = set()
+    self._woken = set()
+
+  def time(self):
+    return self._now
+
+  def sleep(self, seconds):
+    thread = current_thread()
+    with self._condition:
+      if thread in self._woken:
+        # The thread is being stopped; do not let it wait for anything.
+        return
+      entry = [self._now + max(0.0, seconds), next(self._order), thread,
+          False]
+      heapq.heappush(self._sleepers, entry)
+      self._awake.discard(thread)
+      self._condition.notify_all()
+      while not entry[3]:
+        self._condition.wait()
+
+  def wait(self, event, timeout):
+    if event.is_set():
+      return True
+    self.sleep(timeout)
+    return event.is_set()
+
+  def start_thread(self, target):
+    thread = Thread(target=target)
+    with self._condition:
+      self._awake.add(thread)
+    thread.start()
+    return thread
+
+  def wake(self, thread):
+    '''
+    wake(thread)
+
+    Let the thread return from its current sleep, and from every later one
+    at once, so that a thread that is stopped while awake does not go back
+    to sleep and keep stop() from joining it.
+    '''
+    with self._condition:
+      self._woken.add(thread)
+      for entry in self._sleepers:
+        if entry[2] is thread:
+          entry[3] = True
+      self._sleepers = [e for e in self._sleepers if not e[3]]
+      heapq.heapify(self._sleepers)
+      self._condition.notify_all()
+
+  def advance(self, seconds):
+    '''
+    advance(seconds)
+
+    Move time forward by the given number of seconds. See run_until().
+    '''
+    self.run_until(self._now + seconds)
+
+  def run_until(self, t):
+    '''
+    run_until(t)
+
+    Move time forward to t, waking every thread whose wake-up time comes
+    before or at t, in order.
+    '''
+    with self._condition:
+      while True:
+        self.__settle()
+        if not self._sleepers or self._sleepers[0][0] > t:
+          break
+        entry = heapq.heappop(self._sleepers)
+        self._now = max(self._now, entry[0])
+        entry[3] = True
+        self._awake.add(entry[2])
+        self._condition.notify_all()
+      self._now = max(self._now, t)
+
+  def settle(self):
+    '''
+    settle()
+
+    Wait until every tracked thread sleeps or has ended.
+    '''
+    with self._condition:
+      self.__settle()
+
+  def __settle(self):
+    deadline = _time.time() + self.timeout
+    while True:
+      self._awake = set(t for t in self._awake if t.is_alive())
+      self._woken = set(t for t in self._woken if t.is_alive())
+      if not self._awake:
+        return
+      remaining = deadline - _time.time()
+      if remaining <= 0:
+        raise RuntimeError('A thread did not go back to sleep in time.')
+      # Threads that end do not notify, so look again now and then.
+      self._condition.wait(min(remaining, 0.01))
+
+
+_clock = RealClock()
+
+def get_clock():
+  '''
+  wxlive.get_clock()
+
+  Return the clock that wxlive uses.
+  '''
+  return _clock
+
+def set_clock(clock):
+  '''
+  wxlive.set_clock(clock)
+
+  Let wxlive use the given clock, e.g. a SimulatedClock. Set the clock
+  before creating Variables and axes; threads that are already waiting keep
+  waiting on the previous clock.
+  '''
+  global _clock
+  _clock = clock
+
+# vim: set filetype=python shiftwidth=2 softtabstop=2 tabstop=8 expandtab:
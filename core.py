@@ -0,0 +1,1730 @@
+
+from threading import Thread, Condition, Event, Lock, current_thread
+from time import time
+from collections import deque
+import weakref
+import traceback
+from clock import get_clock
+
+# This module holds the wxlive.Variables themselves, and does not import wx
+# (or any other GUI toolkit) until a Variable gets a listener. Headless
+# processes that only acquire or publish values can use it without paying
+# for wx at startup.
+
+# Interval in seconds at which hidden Variables check whether their listeners
+# have become visible again.
+
+VISIBILITY_CHECK_INTERVAL = 0.2
+
+# Policies of a SampleBuffer that is full.
+
+DROP_OLDEST = 'drop-oldest'
+DROP_NEWEST = 'drop-newest'
+BLOCK = 'block'
+
+
+class SelfUpdating(object):
+  def __init__(self, *args, **kwargs):
+    self.__continue = False
+    self.__thread = None
+
+    self._interval = None
+
+  def get_interval(self):
+    '''
+    get_interval()
+
+    Return the currently set interval at wich to do automatic updating.
+    '''
+    return self._interval
+
+  def set_interval(self, value):
+    '''
+    set_interval(value)
+
+    Set the interval at which to do automatic updating.
+
+    The value must be of a type that is or can be coerced to a float.
+    '''
+    if type(value) != float and type(value) != int:
+      raise TypeError('Interval can only be a real number.')
+    self._interval = float(value)
+
+  interval = property(fget = get_interval, fset = set_interval,
+      doc = 'The interval at which to do automatic updating.')
+
+  def start(self, interval = None):
+    '''
+    start(interval = None)
+
+    Start automatic updating of the wxlive.Variable's value. The update()
+    function is called with the given interval. The interval can be changed by
+    setting the interval attribute of the wxlive.Variable.
+    '''
+    if not self.is_active():
+      if interval is not None:
+        self.interval = interval
+
+      self.__continue = True
+      self.__thread = Thread(target=self.__run)
+      self.__thread.start()
+
+  def stop(self):
+    '''
+    stop()
+
+    Stop automatic updating of the Variable's value.
+    '''
+    if self.__thread:
+      self.__continue = False
+      self.__thread.join()
+      self.__thread = None
+
+  def is_active(self):
+    '''
+    is_active()
+
+    Returns True if automatic updating for this Variable has been started.
+    '''
+    return self.__thread is not None
+
+
+class ListenerRegistry(object):
+  '''
+  The set of listeners of a wxlive.Variable.
+
+  Listeners are only referenced weakly, so that a listener that is garbage
+  collected disappears from the registry by itself. Adding and removing a
+  listener take constant time, and iterating over the registry is safe while
+  listeners are being added or removed, also from other threads: iteration
+  uses a snapshot that is only rebuilt after the registry has changed.
+  '''
+  def __init__(self):
+    '''
+    wxlive.ListenerRegistry()
+
+    Construct an empty ListenerRegistry.
+    '''
+    self._lock = Lock()
+    self._refs = {}
+    self._snapshot = ()
+    self._changed = False
+
+  def add(self, listener):
+    '''
+    add(listener)
+
+    Add a listener. Returns False if the listener was already present, True
+    otherwise.
+    '''
+    key = id(listener)
+    registry = weakref.ref(self)
+    def forget(ref):
+      self = registry()
+      if self is not None:
+        self.__forget(key, ref)
+
+    with self._lock:
+      ref = self._refs.get(key)
+      if ref is not None and ref() is listener:
+        return False
+      self._refs[key] = weakref.ref(listener, forget)
+      self._changed = True
+    return True
+
+  def discard(self, listener):
+    '''
+    discard(listener)
+
+    Remove a listener. Returns False if the listener was not present, True
+    otherwise.
+    '''
+    key = id(listener)
+    with self._lock:
+      ref = self._refs.get(key)
+      if ref is None or ref() is not listener:
+        return False
+      del self._refs[key]
+      self._changed = True
+    return True
+
+  def clear(self):
+    '''
+    clear()
+
+    Remove all listeners.
+    '''
+    with self._lock:
+      self._refs.clear()
+      self._changed = True
+
+  def __forget(self, key, ref):
+    with self._lock:
+      if self._refs.get(key) is ref:
+        del self._refs[key]
+        self._changed = True
+
+  def __iter__(self):
+    with self._lock:
+      if self._changed:
+        self._snapshot = tuple(self._refs.values())
+        self._changed = False
+      snapshot = self._snapshot
+    for ref in snapshot:
+      listener = ref()
+      if listener is not None:
+        yield listener
+
+  def __contains__(self, listener):
+    ref = self._refs.get(id(listener))
+    return ref is not None and ref() is listener
+
+  def __len__(self):
+    return len(self._refs)
+
+
+class VisibilityTracker(object):
+  '''
+  Keeps track of whether any of a number of listeners, or consumers, is
+  shown on screen.
+
+  The listeners are checked on the GUI thread, whenever request_check() is
+  called, and the outcome is available from any thread through is_visible().
+  A thread that waits for the listeners to become visible again can use
+  wait(), which returns as soon as a check finds a listener on screen.
+  '''
+  def __init__(self, listeners, consumers = ()):
+    '''
+    wxlive.VisibilityTracker(listeners, consumers = ())
+
+    Construct a VisibilityTracker for listeners and consumers, which must be
+    iterables that can be iterated over repeatedly, e.g.
+    wxlive.ListenerRegistry. Both are checked with is_shown_on_screen().
+    Until the first check, they are assumed to be visible.
+    '''
+    self._listeners = listeners
+    self._consumers = consumers
+    self._visible = True
+    self._scheduled = False
+    self._became_visible = Event()
+
+  def request_check(self):
+    '''
+    request_check()
+
+    Schedule a check of the listeners on the GUI thread, unless one is
+    already scheduled.
+    '''
+    if not self._scheduled:
+      import wx
+      self._scheduled = True
+      wx.CallAfter(self.__check)
+
+  def is_visible(self):
+    '''
+    is_visible()
+
+    Returns True if any listener was shown on screen at the last check.
+    '''
+    return self._visible
+
+  def wait(self, timeout):
+    '''
+    wait(timeout)
+
+    Wait at most timeout seconds for the listeners to become visible.
+    Returns True if they did.
+    '''
+    if get_clock().wait(self._became_visible, timeout):
+      self._became_visible.clear()
+      return True
+    return False
+
+  def is_shown_on_screen(self):
+    '''
+    is_shown_on_screen()
+
+    Check now whether any listener or consumer is shown on screen. Must be
+    called on the GUI thread.
+    '''
+    for group in (self._listeners, self._consumers):
+      for listener in group:
+        if is_shown_on_screen(listener):
+          return True
+    return False
+
+  def __check(self):
+    self._scheduled = False
+    visible = self.is_shown_on_screen()
+    if visible and not self._visible:
+      self._became_visible.set()
+    self._visible = visible
+
+
+class AdaptiveInterval(object):
+  '''
+  An updating interval that adapts to the activity of a signal.
+
+  After every update, feed() is told whether the value changed by more than
+  threshold. A change resets the interval to min_interval, so that
+  transients are followed closely. Every update without a change multiplies
+  the interval by backoff, up to max_interval, so that a quiet signal is
+  polled less and less often.
+  '''
+  def __init__(self, min_interval, max_interval, threshold = 0.0,
+      backoff = 2.0):
+    '''
+    wxlive.AdaptiveInterval(min_interval, max_interval, threshold = 0.0,
+      backoff = 2.0)
+
+    Construct an AdaptiveInterval that starts at min_interval.
+    '''
+    for value in (min_interval, max_interval, threshold, backoff):
+      if type(value) != float and type(value) != int:
+        raise TypeError('Interval settings can only be real numbers.')
+    if min_interval <= 0 or max_interval < min_interval:
+      raise ValueError('Need 0 < min_interval <= max_interval.')
+    if backoff < 1:
+      raise ValueError('Backoff must be at least 1.')
+
+    self.min_interval = float(min_interval)
+    self.max_interval = float(max_interval)
+    self.threshold = float(threshold)
+    self.backoff = float(backoff)
+    self._interval = self.min_interval
+
+  def get_interval(self):
+    '''
+    get_interval()
+
+    Return the current interval.
+    '''
+    return self._interval
+
+  interval = property(fget = get_interval, doc = 'The current interval.')
+
+  def get_rate(self):
+    '''
+    get_rate()
+
+    Return the current number of updates per second.
+    '''
+    return 1.0 / self._interval
+
+  rate = property(fget = get_rate,
+      doc = 'The current number of updates per second.')
+
+  def is_change(self, old, new):
+    '''
+    is_change(old, new)
+
+    Returns True if going from value old to value new counts as a change.
+    For numbers this means a difference larger than threshold, for other
+    values any difference.
+    '''
+    if old is None or new is None:
+      return old is not new
+    try:
+      return abs(new - old) > self.threshold
+    except TypeError:
+      return new != old
+
+  def feed(self, changed):
+    '''
+    feed(changed)
+
+    Adapt the interval after an update, where changed tells whether the
+    update brought a change (see is_change()).
+    '''
+    if changed:
+      self._interval = self.min_interval
+    else:
+      self._interval = min(self._interval * self.backoff, self.max_interval)
+
+  def reset(self):
+    '''
+    reset()
+
+    Go back to min_interval.
+    '''
+    self._interval = self.min_interval
+
+
+class SampleBuffer(object):
+  '''
+  A bounded, thread-safe buffer of (time, value) samples, pushed by
+  producers on any thread and taken out in batches by drain().
+
+  What happens when a sample is put into a full buffer depends on the
+  policy: DROP_OLDEST discards the oldest buffered sample, DROP_NEWEST
+  discards the new sample, and BLOCK makes the producer wait until there is
+  room again. The number of discarded samples is kept in dropped.
+  '''
+  def __init__(self, maxlen = 1024, policy = DROP_OLDEST):
+    '''
+    wxlive.SampleBuffer(maxlen = 1024, policy = DROP_OLDEST)
+
+    Construct an empty SampleBuffer that holds at most maxlen samples.
+    '''
+    if type(maxlen) != int or maxlen < 1:
+      raise ValueError('Maximum length must be a positive integer.')
+    if policy not in (DROP_OLDEST, DROP_NEWEST, BLOCK):
+      raise ValueError('Unknown policy %r.' % (policy,))
+
+    self.maxlen = maxlen
+    self.policy = policy
+    self.dropped = 0
+    self._samples = deque()
+    self._condition = Condition()
+
+  def put(self, sample, timeout = None):
+    '''
+    put(sample, timeout = None)
+
+    Put a sample into the buffer. With the BLOCK policy, wait at most
+    timeout seconds (forever if None) for room; if there is still no room
+    after that, the sample is discarded.
+
+    Returns True if the buffer was empty, i.e. if the sample starts a new
+    batch.
+    '''
+    with self._condition:
+      if len(self._samples) >= self.maxlen:
+        if self.policy == DROP_OLDEST:
+          self._samples.popleft()
+          self.dropped += 1
+        elif self.policy == DROP_NEWEST:
+          self.dropped += 1
+          return False
+        else:
+          if timeout is not None:
+            deadline = time() + timeout
+          while len(self._samples) >= self.maxlen:
+            if timeout is None:
+              self._condition.wait()
+            else:
+              remaining = deadline - time()
+              if remaining <= 0:
+                self.dropped += 1
+                return False
+              self._condition.wait(remaining)
+
+      self._samples.append(sample)
+      return len(self._samples) == 1
+
+  def drain(self):
+    '''
+    drain()
+
+    Take all samples out of the buffer, and return them as a list, oldest
+    first.
+    '''
+    with self._condition:
+      samples = list(self._samples)
+      self._samples.clear()
+      self._condition.notify_all()
+    return samples
+
+  def __len__(self):
+    return len(self._samples)
+
+
+class WriteQueue(object):
+  '''
+  A queue that performs writes on a separate thread, so that a slow set
+  function does not block the thread that requests the write (usually the GUI
+  thread).
+
+  Only the most recently requested value is kept: if a new value is put while
+  an older one is still waiting, the older one is discarded. If max_rate is
+  given, at most that many writes per second are performed.
+
+  An exception raised by a write does not stop the queue. The last such
+  exception is kept, and raised by the next call of flush().
+  '''
+  def __init__(self, write, max_rate = None):
+    '''
+    wxlive.WriteQueue(write, max_rate = None)
+
+    Construct a WriteQueue that calls write(*args) for every value that is
+    taken from the queue. The queue is not started yet.
+    '''
+    self._write = write
+    self._max_rate = None
+    self._condition = Condition()
+    self._pending = None
+    self._busy = False
+    self._last_write = None
+    self._error = None
+    self.__continue = False
+    self.__thread = None
+
+    if max_rate is not None:
+      self.max_rate = max_rate
+
+  def get_max_rate(self):
+    '''
+    get_max_rate()
+
+    Return the maximum number of writes per second, or None if the rate is
+    not limited.
+    '''
+    return self._max_rate
+
+  def set_max_rate(self, value):
+    '''
+    set_max_rate(value)
+
+    Set the maximum number of writes per second. None means no limit.
+    '''
+    if value is not None:
+      if type(value) != float and type(value) != int:
+        raise TypeError('Maximum rate can only be a real number.')
+      if value <= 0:
+        raise ValueError('Maximum rate must be positive.')
+      value = float(value)
+    self._max_rate = value
+
+  max_rate = property(fget = get_max_rate, fset = set_max_rate,
+      doc = 'The maximum number of writes per second.')
+
+  def put(self, *args):
+    '''
+    put(*args)
+
+    Request a write with the given arguments. Any write that was requested
+    earlier but has not yet been performed is discarded.
+    '''
+    with self._condition:
+      self._pending = args
+      self._condition.notify_all()
+
+  def flush(self, timeout = None):
+    '''
+    flush(timeout = None)
+
+    Wait until all requested writes have been performed. Returns False if
+    the timeout (in seconds) expired before that, True otherwise. If a write
+    raised an exception since the previous flush(), that exception is raised
+    instead.
+    '''
+    with self._condition:
+      if timeout is not None:
+        deadline = time() + timeout
+      while self._pending is not None or self._busy:
+        if timeout is None:
+          self._condition.wait()
+        else:
+          remaining = deadline - time()
+          if remaining <= 0:
+            return False
+          self._condition.wait(remaining)
+      error = self._error
+      self._error = None
+    if error is not None:
+      raise error
+    return True
+
+  def start(self):
+    '''
+    start()
+
+    Start the thread that performs the writes.
+    '''
+    if not self.is_active():
+      self.__continue = True
+      self.__thread = Thread(target=self.__run)
+      # Do not keep the process alive for a queue that nobody stopped.
+      self.__thread.daemon = True
+      self.__thread.start()
+
+  def stop(self):
+    '''
+    stop()
+
+    Stop the thread that performs the writes. A write that is still pending
+    is performed before the thread ends.
+    '''
+    if self.__thread:
+      with self._condition:
+        self.__continue = False
+        self._condition.notify_all()
+      # A write may drop the last reference to its Variable, which then stops
+      # the queue from the thread of the queue itself.
+      if self.__thread is not current_thread():
+        self.__thread.join()
+      self.__thread = None
+
+  def is_active(self):
+    '''
+    is_active()
+
+    Returns True if the thread that performs the writes is running.
+    '''
+    return self.__thread is not None
+
+  def __run(self):
+    while True:
+      with self._condition:
+        while self.__continue and self._pending is None:
+          self._condition.wait()
+        if self._pending is None:
+          return
+        if self._max_rate and self._last_write is not None:
+          delay = self._last_write + 1.0 / self._max_rate - time()
+          if delay > 0:
+            # Newer values may arrive in the mean time; look again afterwards.
+            self._condition.wait(delay)
+            continue
+        args = self._pending
+        self._pending = None
+        self._busy = True
+
+      error = None
+      try:
+        self._write(*args)
+      except Exception as e:
+        error = e
+      with self._condition:
+        self._busy = False
+        self._last_write = time()
+        if error is not None:
+          self._error = error
+        self._condition.notify_all()
+
+
+class Variable(object):
+  '''
+  A Variable can send events to wx widgets that are listening, to inform them
+  of a change in value. This allows the wx widgets to update their status
+  according to the new value.
+
+  The Variable will send VariableEvents to wxlive widgets, and are listening
+  to this Variable via the add_listener method. If you have a widget of which
+  there is no wxlive version, see make_listener().
+  '''
+  def __init__(self, variable_type, value, fget = None, fset = None,
+      interval = None, listeners = None, reply_is_new_value = False,
+      write_queue = False, max_write_rate = None, hidden_interval = None,
+      **kwargs):
+    '''
+    wxlive.Variable(variable_type, value, fget = None, fset = None,
+      interval = 1.0, listeners = None, reply_is_new_value = False,
+      write_queue = False, max_write_rate = None, hidden_interval = None)
+
+    Instantiate a Variable of the given type, with the given value.
+
+    Keyword arguments:
+    variable_type  Type of the variable. In reality, this can be any type or
+                   class name that also serves as a coercion function for that
+                   type. E.g. int, float, str, list.
+    value          The starting value for this variable. If this is not None,
+                   then the fset function (if given) is called to set the
+                   variable. If it is None, the initial value will be set to
+                   whatever the get function (see fget) returns. This also
+                   means that any listeners will immediately be informed of
+                   the changed value.
+    fget           A function that is called without arguments, and returns a
+                   value that can be coerced into variable_type. See also
+                   method update().
+    fset           A function that is called with one argument, namely the new
+                   value for the wxlive.Variable. See also method set_value().
+    interval       The interval at which automatic updating of the value is
+                   done. See method start().
+    listeners      A single listener or a list of listeners. If this is not
+                   None, the listeners will be informed of the Variable's
+                   value upon its instantiation.
+    reply_is_new_value  Indicates that the reply of the set function is in
+                        fact the new value for the variable.
+    write_queue    If True, set_value() does not call fset itself, but hands
+                   the value to a write queue that calls fset on a separate
+                   thread. See method start_write_queue().
+    max_write_rate The maximum number of fset calls per second when the write
+                   queue is used.
+    hidden_interval  If not None, automatic updating depends on whether any
+                     listener is shown on screen. See method poll().
+    '''
+    # Private - for internal use only
+    self.__continue = False
+    self.__thread = None
+    self.__write_queue = None
+    self.__last_poll = None
+    self.__reply_is_new_value = reply_is_new_value
+    self.__slave = (interval is None)
+
+    # Protected - access only through methods
+    self._id = None
+    self._listeners = ListenerRegistry()
+    self._consumers = ListenerRegistry()
+    self._value = None
+    self._time = None
+    # Counts the new samples taken, see get_serial()
+    self._serial = 0
+    self._reply = None
+    self._time_offset = 0.0
+    if interval:
+      self._interval = float(interval)
+    else:
+      self._interval = None
+    self._adaptive_interval = None
+    self._hidden_interval = None
+    self._visibility = VisibilityTracker(self._listeners, self._consumers)
+    self._push_buffer = None
+    self._callbacks = ()
+    self._weak_callbacks = ()
+    if hidden_interval is not None:
+      self.hidden_interval = hidden_interval
+
+    # Public - can be changed on the fly
+    self.type = variable_type
+    self.fget = fget
+    self.fset = fset
+
+    # Set the initial value
+    if value is None:
+      self.get_value()
+    else:
+      self.set_value(value)
+
+    if write_queue:
+      self.start_write_queue(max_write_rate)
+
+    # Add the listeners
+    if type(listeners) is list:
+      for i in listeners:
+        self.add_listener(i)
+    elif listeners is not None:
+      self.add_listener(listeners)
+
+  def get_id(self):
+    '''
+    get_id()
+
+    Return the id for this wxlive.Variable. Each event that is sent by this
+    wxlive.Variable will have this id set. The id is obtained from wx when it
+    is first needed.
+    '''
+    if self._id is None:
+      import wx
+      self._id = wx.NewId()
+    return self._id
+
+  id = property(fget = get_id, doc = 'The id of this wxlive.Variable.')
+
+  def get_interval(self):
+    '''
+    get_interval()
+
+    Return the currently set interval at wich to do automatic updating.
+    '''
+    return self._interval
+
+  def set_interval(self, value):
+    '''
+    set_interval(value)
+
+    Set the interval at which to do automatic updating.
+
+    The value must be of a type that is or can be coerced to a float.
+    '''
+    if type(value) != float and type(value) != int:
+      raise TypeError('Interval can only be a real number.')
+    self._interval = float(value)
+
+  interval = property(fget = get_interval, fset = set_interval,
+      doc = 'The interval at which to do automatic updating.')
+
+  def set_adaptive_interval(self, min_interval, max_interval,
+      threshold = 0.0, backoff = 2.0):
+    '''
+    set_adaptive_interval(min_interval, max_interval, threshold = 0.0,
+      backoff = 2.0)
+
+    Let automatic updating adapt its interval to the activity of the value,
+    instead of using the fixed interval. See wxlive.AdaptiveInterval.
+    '''
+    self._adaptive_interval = AdaptiveInterval(min_interval, max_interval,
+        threshold, backoff)
+
+  def clear_adaptive_interval(self):
+    '''
+    clear_adaptive_interval()
+
+    Go back to automatic updating with the fixed interval.
+    '''
+    self._adaptive_interval = None
+
+  def get_adaptive_interval(self):
+    '''
+    get_adaptive_interval()
+
+    Return the wxlive.AdaptiveInterval in use, or None.
+    '''
+    return self._adaptive_interval
+
+  adaptive_interval = property(fget = get_adaptive_interval)
+
+  def get_effective_interval(self):
+    '''
+    get_effective_interval()
+
+    Return the interval that automatic updating currently uses.
+    '''
+    if self._adaptive_interval is not None:
+      return self._adaptive_interval.interval
+    return self._interval
+
+  effective_interval = property(fget = get_effective_interval,
+      doc = 'The interval that automatic updating currently uses.')
+
+  def get_effective_rate(self):
+    '''
+    get_effective_rate()
+
+    Return the number of updates per second that automatic updating
+    currently does, or None if there is no interval.
+    '''
+    interval = self.get_effective_interval()
+    if interval:
+      return 1.0 / interval
+    return None
+
+  effective_rate = property(fget = get_effective_rate,
+      doc = 'The number of updates per second of automatic updating.')
+
+  def get_hidden_interval(self):
+    '''
+    get_hidden_interval()
+
+    Return the interval at which to do automatic updating while no listener
+    is shown on screen, or None if updating does not depend on that.
+    '''
+    return self._hidden_interval
+
+  def set_hidden_interval(self, value):
+    '''
+    set_hidden_interval(value)
+
+    Set the interval at which to do automatic updating while no listener is
+    shown on screen. A value of 0 pauses updating altogether while hidden,
+    and None makes updating independent of visibility.
+    '''
+    if value is not None:
+      if type(value) != float and type(value) != int:
+        raise TypeError('Interval can only be a real number.')
+      value = float(value)
+    self._hidden_interval = value
+
+  hidden_interval = property(fget = get_hidden_interval,
+      fset = set_hidden_interval,
+      doc = 'The interval at which to do automatic updating while hidden.')
+
+  def get_time_offset(self):
+    '''
+    get_time_offset()
+    '''
+    return self._time_offset
+
+  def set_time_offset(self, value):
+    '''
+    set_time_offset(value)
+    '''
+    if value == 'now':
+      value = get_clock().time()
+    elif type(value) != float and type(value) != int:
+      raise TypeError('Time offset can only be a real number.')
+
+    self._time_offset = float(value)
+
+  time_offset = property(fget = get_time_offset, fset = set_time_offset)
+
+  def set_value(self, value, setter_object=None):
+    '''
+    set_value(value, setter_object)
+
+    Set the value of the Variable.
+
+    The value is first coerced to the type of the Variable. If the
+    Variable has a set function defined, through fset, then the value
+    is set using that function. If this function returns something
+    other than None, this reply is emitted as the value of a
+    VariableReplyEvent.  After that, a VariableEvent is emitted with
+    the new value of the Variable as its value.
+
+    setter_object is used internally by widgets that set the value.
+    If the setter_object is also a listener, it is not notified of a
+    change in value, unless the Variable's reply_is_new_value is also
+    set, and the setter function actually returns a value.
+
+    If the write queue is active (see start_write_queue()), the value is
+    only coerced here; setting it and emitting the events happens later on
+    the thread of the write queue.
+    '''
+    value = self.type(value)
+    if self.__write_queue is not None:
+      self.__write_queue.put(value, setter_object)
+    else:
+      self.__write_value(value, setter_object)
+
+  def __write_value(self, value, setter_object):
+    now = get_clock().time()
+    reply = self._call_fset(value)
+    setter_object = self._apply_value(value, reply, now, setter_object)
+    self.notify_listeners(skip_listener=setter_object)
+
+  def _call_fset(self, value):
+    '''
+    _call_fset(value)
+
+    Call fset with a value that was already coerced, and return its reply,
+    without changing the Variable.
+    '''
+    if self.fset is not None:
+      return self.fset(value)
+    return None
+
+  def _apply_value(self, value, reply, now, setter_object = None):
+    '''
+    _apply_value(value, reply, now, setter_object = None)
+
+    Take over a value that was written with _call_fset() and its reply, at
+    clock time now, without notifying the listeners. Returns the listener
+    that should be skipped when they are notified.
+    '''
+    self._time = now - self.time_offset
+    self._reply = reply
+    self._serial += 1
+    if reply and self.__reply_is_new_value:
+      self._value = self.type(reply)
+      return None # setter_object should still be informed of value change
+    self._value = value
+    return setter_object
+
+  def get_value(self, force = False):
+    '''
+    Retrieve the value of the Variable.
+
+    If automatic updating is active (activated using the start() method), then
+    the last updated value is returned. If force is True, or automatic
+    updating is not active, then the value is updated first by calling the
+    fget function, and the result is returned.
+    '''
+    if not self.is_active() or force:
+      self.update()
+    return self._value
+
+  def get_time(self):
+    '''
+    Retrieve the timestamp of the last Variable update. The timestamp is
+    obtained from the clock (see wxlive.get_clock()) minus time_offset.
+    '''
+    return self._time
+
+  time = property(fget = get_time)
+
+  def get_time_value_pair(self, force = False):
+    '''
+    Use get_value() to obtain a current value for the Variable, and return a
+    tuple containing the timestamp of this update and the value.
+    '''
+    if not self.is_active() or force:
+      self.update()
+    return (self._time, self._value)
+
+  value = property(fget = get_value, fset = set_value,
+      doc = 'The value of the Variable.')
+
+  def get_reply(self):
+    return self._reply
+
+  reply = property(fget = get_reply)
+
+  def update(self):
+    '''
+    Update the value of the Variable by running the get function and
+    posting the VariableEvent, but without returning the value.
+
+    If samples were pushed (see push()), they are taken out of the push
+    buffer, the last one becomes the value of the Variable, and all of them
+    are passed to the listeners in the samples member of the VariableEvent.
+
+    Note that the value is updated even if automatic updating is already
+    active.
+    '''
+    samples = None
+    if self._push_buffer is not None:
+      samples = self._push_buffer.drain()
+      if samples:
+        self._time, self._value = samples[-1]
+        self._serial += 1
+      else:
+        samples = None
+    if self.fget is not None:
+      value = self.type(self.fget())
+      self._time = get_clock().time() - self.time_offset
+      self._value = value
+      self._serial += 1
+    self.notify_listeners(samples = samples)
+
+  def get_serial(self):
+    '''
+    get_serial()
+
+    Return the number of times the Variable took a new value or a new batch
+    of pushed samples. The listeners are also notified when nothing new was
+    taken, e.g. when the value of an inactive Variable without fget is read;
+    code that must see every sample exactly once, such as a callback that
+    keeps statistics, compares the serial with the one it saw last.
+    '''
+    return self._serial
+
+  serial = property(fget = get_serial)
+
+  def set_push_buffer(self, maxlen = 1024, policy = DROP_OLDEST):
+    '''
+    set_push_buffer(maxlen = 1024, policy = DROP_OLDEST)
+
+    Allow values to be pushed into the Variable with push(), buffered in a
+    wxlive.SampleBuffer of at most maxlen samples with the given policy for
+    when it is full. Samples that are still buffered are kept.
+    '''
+    old = self._push_buffer
+    self._push_buffer = SampleBuffer(maxlen, policy)
+    if old is not None:
+      for sample in old.drain():
+        self._push_buffer.put(sample)
+
+  def get_push_buffer(self):
+    '''
+    get_push_buffer()
+
+    Return the wxlive.SampleBuffer that holds pushed samples, or None if
+    pushing is not enabled.
+    '''
+    return self._push_buffer
+
+  push_buffer = property(fget = get_push_buffer)
+
+  def push(self, value, time_stamp = None, timeout = None):
+    '''
+    push(value, time_stamp = None, timeout = None)
+
+    Publish a new value from a producer such as a callback of a serial
+    reader or socket, on any thread. Unlike set_value(), fset is not
+    called. The value is coerced to the type of the Variable and buffered
+    together with time_stamp, which defaults to the current time minus
+    time_offset. See set_push_buffer().
+
+    Buffered samples are delivered in one batch by the next update(). If
+    automatic updating is active, that happens at its next interval;
+    otherwise an update() is scheduled on the GUI thread when the first
+    sample of a batch arrives, or, if there are no listeners, update() is
+    called right away. Note that with the BLOCK policy, pushing from the GUI
+    thread of a Variable that is not active can block forever.
+    '''
+    if self._push_buffer is None:
+      raise RuntimeError('Pushing is not enabled, see set_push_buffer().')
+    value = self.type(value)
+    if time_stamp is None:
+      time_stamp = get_clock().time() - self.time_offset
+    if self._push_buffer.put((time_stamp, value), timeout) and \
+        not self.is_active():
+      if len(self._listeners):
+        import wx
+        wx.CallAfter(self.update)
+      else:
+        self.update()
+
+  def poll(self):
+    '''
+    poll()
+
+    Call update(), unless the Variable is hidden. This is what automatic
+    updating does at every interval.
+
+    If hidden_interval is None, the Variable is never hidden. Otherwise, it
+    is hidden while it has listeners or consumers (see add_consumer()), but
+    none of them is shown on screen, and nothing else uses its value: a
+    Variable without either, or with callbacks (see add_callback()), is
+    never hidden. A hidden Variable is not updated if hidden_interval is 0,
+    and at most once every hidden_interval seconds otherwise. As soon as a
+    listener becomes visible again, automatic updating resumes with an
+    immediate update.
+
+    Returns True if update() was called.
+    '''
+    if self._hidden_interval is not None and not self.__has_demand():
+      self._visibility.request_check()
+      if not self._visibility.is_visible():
+        if self._hidden_interval <= 0 or (self.__last_poll is not None and
+            get_clock().time() - self.__last_poll < self._hidden_interval):
+          return False
+    self.__last_poll = get_clock().time()
+    self.update()
+    return True
+
+  def is_visible(self):
+    '''
+    is_visible()
+
+    Returns False if the Variable is hidden, see poll().
+    '''
+    return self._hidden_interval is None or self.__has_demand() or \
+        self._visibility.is_visible()
+
+  def __has_demand(self):
+    return not (len(self._listeners) or len(self._consumers)) or \
+        len(self._callbacks) > len(self._weak_callbacks)
+
+  def is_shown_on_screen(self):
+    '''
+    is_shown_on_screen()
+
+    Returns True if the value of the Variable is used: if nothing is
+    registered that can be hidden, or if any listener or consumer is shown
+    on screen. Must be called on the GUI thread. This lets a Variable that
+    follows another one, such as a wxlive.StatisticVariable, be a consumer
+    of it.
+    '''
+    return self.__has_demand() or self._visibility.is_shown_on_screen()
+
+  def add_consumer(self, consumer):
+    '''
+    add_consumer(consumer)
+
+    Register an object that reads the value of the Variable without being a
+    listener, such as a plot on live axes or a server that publishes the
+    value. Like listeners, consumers are checked with is_shown_on_screen():
+    a consumer with an is_shown_on_screen() method, e.g. a plot, keeps the
+    Variable from being hidden only while that returns True, and any other
+    consumer always does (see poll()). The Variable only keeps a weak
+    reference to the consumer.
+    '''
+    self._consumers.add(consumer)
+
+  def remove_consumer(self, consumer):
+    '''
+    remove_consumer(consumer)
+
+    Unregister a consumer that was registered with add_consumer().
+    '''
+    self._consumers.discard(consumer)
+
+  def add_listener(self, listener, eventfunc = None):
+    '''
+    add_listener(listener)
+
+    Adds a widget as a listener. The widget's on_live_variable_event will be
+    bound to receive the wxlive.VariableEvent for this wxlive.Variable.
+
+    Alternatively, eventfunc can be provided, which will be bound to receive
+    the wxlive.VariableEvent. This should be either a method or function that
+    receives one variable, namely the event.
+    '''
+    import wx
+    from wxlive import VariableEvent, EVT_VARIABLE
+
+    if not isinstance(listener, wx.EvtHandler):
+      listener = getattr(listener, 'event_handler', None)
+
+    if listener is not None:
+      if eventfunc is None:
+        eventfunc = getattr(listener, 'on_live_variable_event', None)
+
+      if eventfunc is not None:
+        listener.Bind(EVT_VARIABLE, eventfunc, id = self.id)
+
+      if self._listeners.add(listener) and isinstance(listener, wx.Window):
+        listener.Bind(wx.EVT_WINDOW_DESTROY, self.__on_listener_destroy)
+
+      evt = VariableEvent(time = self._time, value = self._value,
+          reply = self._reply, samples = None)
+      evt.SetId(self.id)
+
+      try:
+        wx.PostEvent(listener, evt)
+      except (KeyboardInterrupt, SystemExit):
+        raise
+      except:
+        self._listeners.discard(listener)
+        raise
+
+  def remove_listener(self, listener):
+    '''
+    remove_listener(listener)
+
+    Removes a widget as a listener. The widget's on_live_variable_event will
+    be unbound to recieve the wxlive.VariableEvent for this wxlive.Variable.
+    Simply put, this method does the inverted of what add_listener() does, and
+    the wxlive.Variable ceases to send wxlive.VariableEvent's to the widget.
+    '''
+    import wx
+    from wxlive import EVT_VARIABLE
+
+    if not isinstance(listener, wx.EvtHandler):
+      listener = getattr(listener, 'event_handler', None)
+
+    if listener is not None:
+      listener.Unbind(EVT_VARIABLE, listener, id = self.id)
+
+      if self._listeners.discard(listener) and \
+          isinstance(listener, wx.Window):
+        listener.Unbind(wx.EVT_WINDOW_DESTROY,
+            handler = self.__on_listener_destroy)
+
+  def __on_listener_destroy(self, evt):
+    self._listeners.discard(evt.GetEventObject())
+    evt.Skip()
+
+  def start(self, interval = None):
+    '''
+    start(interval = None)
+
+    Start automatic updating of the wxlive.Variable's value. The update()
+    function is called with the given interval. The interval can be changed by
+    setting the interval attribute of the wxlive.Variable.
+    '''
+    if not self.is_active():
+      if interval is not None:
+        self.interval = interval
+
+      self.__continue = True
+      self.__thread = get_clock().start_thread(self.__run)
+
+  def stop(self):
+    '''
+    stop()
+
+    Stop automatic updating of the Variable's value.
+    '''
+    if self.__thread:
+      self.__continue = False
+      get_clock().wake(self.__thread)
+      self.__thread.join()
+      self.__thread = None
+
+  def is_active(self):
+    '''
+    is_active()
+
+    Returns True if automatic updating for this Variable has been started.
+    '''
+    return self.__thread is not None
+
+  def start_write_queue(self, max_rate = None):
+    '''
+    start_write_queue(max_rate = None)
+
+    Let set_value() hand values to a wxlive.WriteQueue, which calls fset on a
+    separate thread. Only the most recent value is written if values arrive
+    faster than they can be written, and at most max_rate values are written
+    per second if max_rate is given. This keeps e.g. a dragged Slider
+    responsive when fset is slow.
+
+    The write queue only refers weakly to the Variable, so a Variable that is
+    no longer used stops its write queue when it is deleted. If fset raises
+    an exception, the queue keeps running, and flush_writes() raises it.
+    '''
+    if self.__write_queue is None:
+      ref = weakref.ref(self)
+      def write(value, setter_object):
+        variable = ref()
+        if variable is not None:
+          variable.__write_value(value, setter_object)
+      self.__write_queue = WriteQueue(write, max_rate)
+      self.__write_queue.start()
+    elif max_rate is not None:
+      self.__write_queue.max_rate = max_rate
+
+  def stop_write_queue(self):
+    '''
+    stop_write_queue()
+
+    Stop using the write queue. A value that is still pending is written
+    first. After this, set_value() calls fset directly again.
+    '''
+    if self.__write_queue is not None:
+      queue = self.__write_queue
+      self.__write_queue = None
+      queue.stop()
+
+  def is_write_queue_active(self):
+    '''
+    is_write_queue_active()
+
+    Returns True if set_value() uses the write queue.
+    '''
+    return self.__write_queue is not None
+
+  def flush_writes(self, timeout = None):
+    '''
+    flush_writes(timeout = None)
+
+    Wait until all values handed to the write queue have been written.
+    Returns False if the timeout expired first, True otherwise. If fset raised
+    an exception on the thread of the write queue since the previous call,
+    that exception is raised here.
+    '''
+    if self.__write_queue is not None:
+      return self.__write_queue.flush(timeout)
+    return True
+
+  def reset_time_offset(self, value = None):
+    '''
+    reset_time_offset(value = None)
+
+    Reset the time offset kept internally. By default, the current time (i.e.
+    as returned by wxlive.get_clock().time()) is used.
+    '''
+    if value is None:
+      value = 'now'
+    self.set_time_offset(value)
+
+  def add_callback(self, func):
+    '''
+    add_callback(func)
+
+    Add a function that is called as func(time, value, samples) every time
+    the listeners are notified, with the same members as the VariableEvent.
+    Unlike listeners, callbacks are called directly, on the thread that
+    updated the Variable, so they must be quick and must not touch wx
+    widgets. They are meant for code that processes every value, such as
+    loggers and bridges to other processes. An exception raised by a
+    callback is printed, and does not stop the notification.
+    '''
+    self._callbacks = self._callbacks + (func,)
+
+  def add_weak_callback(self, method):
+    '''
+    add_weak_callback(method)
+
+    Add a bound method as a callback (see add_callback()), without keeping
+    the object of the method alive. Once that object is gone, the callback
+    removes itself. Neither holds the Variable, so that no reference cycles
+    through the Variable are made. Returns the callback, which can be passed
+    to remove_callback().
+
+    Unlike other callbacks, a weak callback does not keep the Variable from
+    being hidden (see poll()); its object can register itself as a consumer
+    instead.
+    '''
+    func = method.__func__
+    variable_ref = weakref.ref(self)
+    def forget(ref):
+      variable = variable_ref()
+      if variable is not None:
+        variable.remove_callback(callback)
+    obj_ref = weakref.ref(method.__self__, forget)
+    def callback(time, value, samples):
+      obj = obj_ref()
+      if obj is not None:
+        func(obj, time, value, samples)
+    self.add_callback(callback)
+    self._weak_callbacks = self._weak_callbacks + (callback,)
+    return callback
+
+  def remove_callback(self, func):
+    '''
+    remove_callback(func)
+
+    Remove a function added with add_callback(). Does nothing if the
+    function is not a callback.
+    '''
+    callbacks = list(self._callbacks)
+    if func in callbacks:
+      callbacks.remove(func)
+      self._callbacks = tuple(callbacks)
+    weak_callbacks = list(self._weak_callbacks)
+    if func in weak_callbacks:
+      weak_callbacks.remove(func)
+      self._weak_callbacks = tuple(weak_callbacks)
+
+  def notify_listeners(self, skip_listener = None, samples = None):
+    for func in self._callbacks:
+      try:
+        func(self._time, self._value, samples)
+      except (KeyboardInterrupt, SystemExit):
+        raise
+      except:
+        # A failing callback must not keep the others, or the listeners,
+        # from being notified.
+        traceback.print_exc()
+
+    if not len(self._listeners):
+      return
+
+    import wx
+    from wxlive import VariableEvent
+
+    evt = VariableEvent(time = self._time, value = self._value,
+        reply = self._reply, samples = samples)
+    evt.SetId(self.id)
+    for w in self._listeners:
+      if w == skip_listener:
+        continue
+      try:
+        wx.PostEvent(w, evt)
+      except (KeyboardInterrupt, SystemExit):
+        raise
+      except:
+        self._listeners.discard(w)
+
+  def __run(self):
+    while self.__continue:
+      adaptive = self._adaptive_interval
+      value = self._value
+      if self.poll() and adaptive is not None:
+        adaptive.feed(adaptive.is_change(value, self._value))
+
+      if not self.is_visible():
+        if self._visibility.wait(VISIBILITY_CHECK_INTERVAL) and \
+            adaptive is not None:
+          adaptive.reset()
+      else:
+        interval = self.get_effective_interval()
+        if interval:
+          get_clock().sleep(interval)
+
+  ## For comparisons
+  def __eq__(self, other):
+    return self.value == other
+
+  def __ne__(self, other):
+    return self.value != other
+
+  def __lt__(self, other):
+    return self.value < other
+
+  def __le__(self, other):
+    return self.value <= other
+
+  def __gt__(self, other):
+    return self.value > other
+
+  def __ge__(self, other):
+    return self.value >= other
+
+  def __float__(self):
+    return float(self.value)
+
+  def __int__(self):
+    return int(self.value)
+
+  def __str__(self):
+    return str(self.value)
+
+  def __del__(self):
+    self.stop()
+    self.stop_write_queue()
+
+
+class BatchWriteError(Exception):
+  '''
+  Raised by wxlive.VariableList.set_values() when some of the values could
+  not be written. The errors attribute maps every wxlive.Variable whose value
+  was not written to the exception that its write raised. All other values
+  were written.
+  '''
+  def __init__(self, errors):
+    self.errors = errors
+    Exception.__init__(self, '%d of the writes failed: %s' % (len(errors),
+        '; '.join('%s: %s' % (type(e).__name__, e)
+          for e in errors.values())))
+
+
+class VariableList(list):
+  '''
+  A list that contains wxlive.Variables and the possibility of running an
+  update thread. This allows (near-)synchronisation of updating of multiple
+  wxlive.Variables. Thus instead of start()-ing each wxlive.Variable
+  separately, one can add all to a wxlive.VariableList, and start() the list.
+
+  A wxlive.VariableList has an attribute called interval, which indicates the
+  interval in seconds at which to update the Variables. This attribute can be
+  changed at any given time.
+
+  CAVEAT: Once a wxlive.Variable is added to a wxlive.VariableList, it can
+  still be updated separately, or even start()-ed on its own. This is not
+  intended, but there is no explicit check to verify this.
+  '''
+  def __init__(self, interval = 1.0, *args, **kwargs):
+    '''
+    wxlive.VariableList(interval = 1.0)
+
+    Construct a wxlive.VariableList with an updating interval in seconds
+    (default: 1.0). Updating is not started yet.
+    '''
+    super(VariableList, self).__init__(*args, **kwargs)
+    self.__thread = None
+    self.__continue = False
+    self._interval = float(interval)
+    self._adaptive_interval = None
+
+  def get_interval(self):
+    '''
+    get_interval()
+
+    Return the currently set interval at wich to do automatic updating.
+    '''
+    return self._interval
+
+  def set_interval(self, value):
+    '''
+    set_interval(value)
+
+    Set the interval at which to do automatic updating.
+
+    The value must be of a type that is or can be coerced to a float.
+    '''
+    self._interval = float(value)
+
+  interval = property(fget = get_interval, fset = set_interval,
+      doc = 'The interval at which to do automatic updating.')
+
+  def set_adaptive_interval(self, min_interval, max_interval,
+      threshold = 0.0, backoff = 2.0):
+    '''
+    set_adaptive_interval(min_interval, max_interval, threshold = 0.0,
+      backoff = 2.0)
+
+    Let updating adapt its interval to the activity of the
+    wxlive.Variables, instead of using the fixed interval. The interval
+    drops to min_interval whenever any wxlive.Variable changes. See
+    wxlive.AdaptiveInterval.
+    '''
+    self._adaptive_interval = AdaptiveInterval(min_interval, max_interval,
+        threshold, backoff)
+
+  def clear_adaptive_interval(self):
+    '''
+    clear_adaptive_interval()
+
+    Go back to updating with the fixed interval.
+    '''
+    self._adaptive_interval = None
+
+  def get_adaptive_interval(self):
+    '''
+    get_adaptive_interval()
+
+    Return the wxlive.AdaptiveInterval in use, or None.
+    '''
+    return self._adaptive_interval
+
+  adaptive_interval = property(fget = get_adaptive_interval)
+
+  def get_effective_interval(self):
+    '''
+    get_effective_interval()
+
+    Return the interval that updating currently uses.
+    '''
+    if self._adaptive_interval is not None:
+      return self._adaptive_interval.interval
+    return self._interval
+
+  effective_interval = property(fget = get_effective_interval,
+      doc = 'The interval that updating currently uses.')
+
+  def get_effective_rate(self):
+    '''
+    get_effective_rate()
+
+    Return the number of updates per second that updating currently does,
+    or None if there is no interval.
+    '''
+    interval = self.get_effective_interval()
+    if interval:
+      return 1.0 / interval
+    return None
+
+  effective_rate = property(fget = get_effective_rate,
+      doc = 'The number of updates per second.')
+
+  def append(self, item):
+    '''
+    append(item)
+
+    Append an item, which must be an instance of a wxlive.Variable to the
+    list. If the item was active (i.e. had been start()-ed) it will be
+    stopped.
+    '''
+    if not isinstance(item, Variable):
+      raise TypeError('Item must be instance of wxlive.Variable.')
+    item.stop()
+    super(VariableList, self).append(item)
+
+  def prepend(self, item):
+    '''
+    prepend(item)
+
+    Prepend an item, which must be an instance of a wxlive.Variable to the
+    list. If the item was active (i.e. had been start()-ed) it will be
+    stopped.
+    '''
+    if not isinstance(item, Variable):
+      raise TypeError('Item must be instance of wxlive.Variable.')
+    item.stop()
+    super(VariableList, self).prepend(item)
+
+  def set_values(self, items, multi_set = None, setter_object = None):
+    '''
+    set_values(items, multi_set = None, setter_object = None)
+
+    Write the values of several wxlive.Variables as one batch. items is a
+    dict or a sequence of (variable, value) pairs. Every value is coerced to
+    the type of its Variable, and then written:
+
+    - if multi_set is given, by a single call of multi_set with the list of
+      (variable, value) pairs, instead of calling the fset of each Variable.
+      It returns None, or a sequence with the reply of each pair; a reply
+      that is an exception marks the write of that pair as failed.
+    - otherwise, by calling the fset of every Variable, each on its own
+      thread, so that slow set functions wait for each other only once.
+
+    After all writes are done, the Variables take over their values and
+    replies with the same timestamp, and only then are the listeners
+    notified, except setter_object (see wxlive.Variable.set_value()). A
+    write queue of a Variable (see Variable.start_write_queue()) is not
+    used.
+
+    If any of the writes fail, the others are still applied, after which a
+    wxlive.BatchWriteError is raised that holds the exception of each
+    failed Variable.
+    '''
+    if hasattr(items, 'items'):
+      items = items.items()
+    errors = {}
+    pairs = []
+    for variable, value in items:
+      if not isinstance(variable, Variable):
+        raise TypeError('Item must be instance of wxlive.Variable.')
+      try:
+        pairs.append((variable, variable.type(value)))
+      except Exception as e:
+        errors[variable] = e
+
+    replies = [None] * len(pairs)
+    failed = [None] * len(pairs)
+    if multi_set is not None:
+      try:
+        result = multi_set(list(pairs))
+      except Exception as e:
+        failed = [e] * len(pairs)
+      else:
+        if result is not None:
+          result = list(result)
+          if len(result) != len(pairs):
+            raise ValueError('multi_set must return one reply per item.')
+          for i, reply in enumerate(result):
+            if isinstance(reply, Exception):
+              failed[i] = reply
+            else:
+              replies[i] = reply
+    else:
+      def write(i):
+        try:
+          replies[i] = pairs[i][0]._call_fset(pairs[i][1])
+        except Exception as e:
+          failed[i] = e
+      writers = [Thread(target=write, args=(i,))
+          for i, (variable, value) in enumerate(pairs)
+          if variable.fset is not None]
+      for w in writers:
+        w.start()
+      for w in writers:
+        w.join()
+
+    now = get_clock().time()
+    notify = []
+    for (variable, value), reply, e in zip(pairs, replies, failed):
+      if e is not None:
+        errors[variable] = e
+      else:
+        notify.append((variable,
+          variable._apply_value(value, reply, now, setter_object)))
+    for variable, skip in notify:
+      variable.notify_listeners(skip_listener=skip)
+
+    if errors:
+      raise BatchWriteError(errors)
+
+  def start(self, interval = None):
+    '''
+    start(interval = None)
+
+    Start updating of the wxlive.Variables in the wxlive.VariableList. If no
+    interval in seconds is given, the interval attribute of the
+    wxlive.VariableList is used.
+
+    If the wxlive.VariableList was already start()-ed, this function does
+    nothing else than potentially change the updating interval.
+    '''
+    if interval is not None:
+      self.interval = float(interval)
+
+    if not self.is_active():
+      self.__continue = True
+      self.__thread = get_clock().start_thread(self.__run)
+
+  def stop(self):
+    '''
+    stop()
+
+    Stop updating the wxlive.Variables in the wxlive.VariableList.
+    '''
+    if self.__thread:
+      self.__continue = False
+      get_clock().wake(self.__thread)
+      self.__thread.join()
+      self.__thread = None
+
+  def is_active(self):
+    '''
+    is_active()
+
+    Predicate to see if the wxlive.VariableList() interval is start()-ed.
+    '''
+    return self.__thread is not None
+
+  def __run(self):
+    while self.__continue:
+      adaptive = self._adaptive_interval
+      changed = False
+      for i in self:
+        value = i._value
+        if i.poll() and adaptive is not None and \
+            adaptive.is_change(value, i._value):
+          changed = True
+      if adaptive is not None:
+        adaptive.feed(changed)
+
+      interval = self.get_effective_interval()
+      if interval:
+        get_clock().sleep(interval)
+
+  def __del__(self):
+    self.stop()
+
+
+#### Functions
+
+def is_shown_on_screen(listener):
+  '''
+  wxlive.is_shown_on_screen(listener)
+
+  Returns True if the listener is shown on screen. For a wx.Window, this is
+  what its IsShownOnScreen() method returns. Other listeners may provide an
+  is_shown_on_screen() method themselves; if they do not, they are assumed
+  to be shown.
+  '''
+  import wx
+
+  if isinstance(listener, wx.Window):
+    return listener.IsShownOnScreen()
+  shown = getattr(listener, 'is_shown_on_screen', None)
+  if shown is not None:
+    return shown()
+  return True
+
+# vim: set filetype=python shiftwidth=2 softtabstop=2 tabstop=8 expandtab: 
@@ -56,6 +56,9 @@ class DemoFrame(wx.Frame):
 
     self.axes.set_xbound(lower=-1, upper=30)
     self.axes.set_ybound(lower=-1, upper=1)
+    # Instead of fixed bounds, the axes can follow the Variable plots. The
+    # bounds only change when the data leaves them, so redrawing stays cheap.
+    #self.axes.set_live_autoscale(margin=0.1)
 
     vbox = wx.BoxSizer(wx.VERTICAL)
     vbox.Add(self.canvas, 0, wx.ALL|wx.EXPAND, 5)
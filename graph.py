@@ -1,25 +1,48 @@
 from matplotlib.axes import Axes
 import axes as ax
 
-def axes_set_x_variable(axes, x_variable, interval = None):
+def axes_set_x_variable(axes, x_variable, interval = None, aligned = False):
   '''Enable the axes to plot wxlive.Variables. The x_variable is the
      wxlive.Variable whose value is assumed to be the x value. If interval is
      provided, the axes will automatically query the x_variable with that
-     interval.'''
+     interval.
+
+     If aligned is True, the axes keep the timestamped values of the
+     x_variable and of every plotted Variable, and pair x and y values by
+     interpolating y at the timestamps of x, instead of reading y whenever x
+     changes. The Variables are then not queried by the axes at all, and must
+     be updated by other means, e.g. by start()-ing them or a VariableList;
+     an interval only sets how often the plots are redrawn.'''
   method = type(axes.plot)
   if interval:
     ax.make_axes_self_updating(axes, interval)
+  else:
+    ax.make_axes_live(axes)
+
+  if getattr(axes, '_x_history', None) is not None:
+    axes._x_history.detach()
+    axes._x_history = None
+  if aligned:
+    axes._plot_class = ax.AlignedVariablePlot
+    axes._x_history = ax.SampleHistory(x_variable)
+    axes.update = method(ax.axes_aligned_update, axes, Axes)
+  elif interval:
     axes.update = method(ax.axes_self_updating_update, axes,
         Axes)
   else:
-    ax.make_axes_live(axes)
     axes.update = method(ax.axes_update, axes, Axes)
+
+  if not interval:
     axes.event_handler = ax.AxesEvtHandler(axes)
     x_variable.add_listener(axes)
     axes.reset_plots()
   
   axes._x_variable = x_variable
   axes._x_variable_id = x_variable.id
+  if interval:
+    # The axes read the x_variable themselves, or record it, without
+    # listening to it.
+    x_variable.add_consumer(axes)
 
   return axes
 
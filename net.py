@@ -0,0 +1,621 @@
+
+import errno
+import socket
+import select
+import struct
+import numbers
+from threading import Thread, Lock
+from time import time
+from core import Variable
+
+# Frames consist of a header with the length of the body and the frame type,
+# followed by the body. All numbers are in network byte order.
+#
+# CATALOG  server -> client  count, then (index, name) for every Variable
+# UPDATE   server -> client  count, then (index, time, value) for every
+#                            Variable that changed since the previous tick
+# SET      client -> server  index, value
+
+HEADER = struct.Struct('!IB')
+COUNT = struct.Struct('!H')
+INDEX = struct.Struct('!H')
+TIME = struct.Struct('!d')
+
+CATALOG = 1
+UPDATE = 2
+SET = 3
+
+NONE = b'n'
+BOOL = b'b'
+INT = b'i'
+FLOAT = b'f'
+STRING = b's'
+
+INT64 = struct.Struct('!q')
+BYTE = struct.Struct('!B')
+LENGTH = struct.Struct('!I')
+
+MAX_FRAME = 1 << 24
+MAX_BACKLOG = 1 << 24
+
+WOULD_BLOCK = (errno.EAGAIN, errno.EWOULDBLOCK, errno.EINTR)
+
+
+class ProtocolError(Exception):
+  '''Raised when a peer sends data that does not follow the protocol.'''
+  pass
+
+
+def encode_value(value):
+  '''
+  wxlive.net.encode_value(value)
+
+  Encode a value as a type tag followed by its binary representation. None,
+  booleans, integers and real numbers are sent as such; any other value is
+  sent as its string representation, and is coerced back by the
+  variable_type of the receiving Variable.
+  '''
+  if value is None:
+    return NONE
+  if isinstance(value, bool):
+    return BOOL + BYTE.pack(value)
+  if isinstance(value, numbers.Integral) and -2**63 <= value < 2**63:
+    return INT + INT64.pack(value)
+  if isinstance(value, numbers.Real):
+    return FLOAT + TIME.pack(value)
+  if not isinstance(value, bytes):
+    value = str(value).encode('utf-8')
+  return STRING + LENGTH.pack(len(value)) + value
+
+def decode_value(data, offset):
+  '''
+  wxlive.net.decode_value(data, offset)
+
+  Decode a value encoded by encode_value() that starts at offset in data.
+  Returns the value and the offset just after it.
+  '''
+  tag = data[offset:offset+1]
+  offset += 1
+  if tag == NONE:
+    return None, offset
+  if tag == BOOL:
+    return bool(BYTE.unpack_from(data, offset)[0]), offset + BYTE.size
+  if tag == INT:
+    return INT64.unpack_from(data, offset)[0], offset + INT64.size
+  if tag == FLOAT:
+    return TIME.unpack_from(data, offset)[0], offset + TIME.size
+  if tag == STRING:
+    length = LENGTH.unpack_from(data, offset)[0]
+    offset += LENGTH.size
+    return bytes(data[offset:offset+length]).decode('utf-8'), offset + length
+  raise ProtocolError('Unknown value tag %r.' % (tag,))
+
+def encode_frame(frame_type, body):
+  return HEADER.pack(len(body), frame_type) + body
+
+def decode_frames(buf):
+  '''
+  wxlive.net.decode_frames(buf)
+
+  Take all complete frames out of the bytearray buf, and return them as a
+  list of (frame_type, body) tuples.
+  '''
+  frames = []
+  offset = 0
+  while len(buf) - offset >= HEADER.size:
+    length, frame_type = HEADER.unpack_from(buf, offset)
+    if length > MAX_FRAME:
+      raise ProtocolError('Frame too long.')
+    end = offset + HEADER.size + length
+    if len(buf) < end:
+      break
+    frames.append((frame_type, bytes(buf[offset+HEADER.size:end])))
+    offset = end
+  del buf[:offset]
+  return frames
+
+
+class VariableServer(object):
+  '''
+  A server that publishes wxlive.Variables over TCP, so that many GUIs can
+  watch the same Variables while only one process polls them.
+
+  At every interval, the server takes the time and value of every published
+  Variable with get_time_value_pair(), and sends the ones whose value
+  changed to all clients in a single frame. Note that this calls update() on
+  Variables that are not active, which makes the server the poller of those
+  Variables. Values that clients set are passed to set_value() of the
+  published Variable.
+
+  Clients are written to without blocking: what a client cannot take yet is
+  kept for it, and sent as soon as it can. A client that falls more than
+  MAX_BACKLOG bytes behind is disconnected, so that it does not hold up the
+  other clients.
+  '''
+  def __init__(self, host = '127.0.0.1', port = 0, interval = 0.1):
+    '''
+    wxlive.VariableServer(host = '127.0.0.1', port = 0, interval = 0.1)
+
+    Construct a VariableServer that will listen on the given host and port.
+    With port 0, a free port is chosen; see address. The server is not
+    started yet.
+    '''
+    self._host = host
+    self._port = port
+    self._interval = float(interval)
+    self._lock = Lock()
+    self._names = []
+    self._variables = []
+    self._last = []
+    self._catalog_changed = False
+    self._socket = None
+    self._clients = {}
+    self._outgoing = {}
+    self.__continue = False
+    self.__thread = None
+
+  def get_interval(self):
+    '''
+    get_interval()
+
+    Return the interval at which updates are sent.
+    '''
+    return self._interval
+
+  def set_interval(self, value):
+    '''
+    set_interval(value)
+
+    Set the interval at which updates are sent.
+    '''
+    if type(value) != float and type(value) != int:
+      raise TypeError('Interval can only be a real number.')
+    self._interval = float(value)
+
+  interval = property(fget = get_interval, fset = set_interval,
+      doc = 'The interval at which updates are sent.')
+
+  def get_address(self):
+    '''
+    get_address()
+
+    Return the (host, port) the server listens on, or None if it is not
+    started.
+    '''
+    if self._socket is None:
+      return None
+    return self._socket.getsockname()[:2]
+
+  address = property(fget = get_address)
+
+  def publish(self, name, variable):
+    '''
+    publish(name, variable)
+
+    Publish a wxlive.Variable under the given name.
+    '''
+    if not isinstance(variable, Variable):
+      raise TypeError('Item must be instance of wxlive.Variable.')
+    with self._lock:
+      if name in self._names:
+        raise ValueError('A Variable named %r is already published.' % name)
+      if len(self._names) >= 1 << 16:
+        raise ValueError('Too many published Variables.')
+      self._names.append(name)
+      self._variables.append(variable)
+      self._last.append(None)
+      self._catalog_changed = True
+    variable.add_consumer(self)
+
+  def start(self):
+    '''
+    start()
+
+    Start listening for clients and sending updates.
+    '''
+    if not self.is_active():
+      self._socket = socket.socket(socket.AF_INET, socket.SOCK_STREAM)
+      self._socket.setsockopt(socket.SOL_SOCKET, socket.SO_REUSEADDR, 1)
+      self._socket.bind((self._host, self._port))
+      self._socket.listen(5)
+      self.__continue = True
+      self.__thread = Thread(target=self.__run)
+      self.__thread.start()
+
+  def stop(self):
+    '''
+    stop()
+
+    Stop the server and disconnect all clients.
+    '''
+    if self.__thread:
+      self.__continue = False
+      self.__thread.join()
+      self.__thread = None
+      for client in list(self._clients):
+        self.__drop(client)
+      self._socket.close()
+      self._socket = None
+
+  def is_active(self):
+    '''
+    is_active()
+
+    Returns True if the server has been started.
+    '''
+    return self.__thread is not None
+
+  def __catalog_frame(self):
+    body = [COUNT.pack(len(self._names))]
+    for index, name in enumerate(self._names):
+      name = name.encode('utf-8')
+      body.append(INDEX.pack(index) + COUNT.pack(len(name)) + name)
+    return encode_frame(CATALOG, b''.join(body))
+
+  def __update_frame(self, indices, samples):
+    body = [COUNT.pack(len(indices))]
+    for index in indices:
+      t, value = samples[index]
+      if t is None:
+        t = float('nan')
+      body.append(INDEX.pack(index) + TIME.pack(t) + encode_value(value))
+    return encode_frame(UPDATE, b''.join(body))
+
+  def __tick(self, new_clients):
+    with self._lock:
+      variables = list(self._variables)
+      catalog_changed = self._catalog_changed
+      self._catalog_changed = False
+
+    samples = []
+    for v in variables:
+      try:
+        samples.append(v.get_time_value_pair())
+      except Exception:
+        # A Variable whose fget fails is skipped until it works again.
+        samples.append(None)
+    changed = []
+    for index, sample in enumerate(samples):
+      if sample is None:
+        continue
+      last = self._last[index]
+      if last is None or last[1] != sample[1]:
+        changed.append(index)
+        self._last[index] = sample
+
+    frames = b''
+    if catalog_changed:
+      frames += self.__catalog_frame()
+    if changed:
+      frames += self.__update_frame(changed, samples)
+    welcome = b''
+    if new_clients:
+      welcome = self.__catalog_frame() + self.__update_frame(
+          [i for i, sample in enumerate(samples) if sample is not None],
+          samples)
+
+    for client in list(self._clients):
+      data = welcome if client in new_clients else frames
+      if data:
+        outgoing = self._outgoing[client]
+        if len(outgoing) + len(data) > MAX_BACKLOG:
+          self.__drop(client)
+          continue
+        outgoing.extend(data)
+        self.__send(client)
+
+  def __send(self, client):
+    outgoing = self._outgoing[client]
+    try:
+      sent = client.send(outgoing)
+    except socket.error as e:
+      if e.errno in WOULD_BLOCK:
+        return
+      self.__drop(client)
+      return
+    del outgoing[:sent]
+
+  def __receive(self, client):
+    try:
+      data = client.recv(65536)
+    except socket.error as e:
+      if e.errno in WOULD_BLOCK:
+        return
+      data = b''
+    if not data:
+      self.__drop(client)
+      return
+
+    buf = self._clients[client]
+    buf.extend(data)
+    try:
+      frames = decode_frames(buf)
+    except ProtocolError:
+      self.__drop(client)
+      return
+    for frame_type, body in frames:
+      try:
+        if frame_type != SET:
+          raise ProtocolError('Unexpected frame type %d.' % frame_type)
+        index = INDEX.unpack_from(body, 0)[0]
+        value = decode_value(body, INDEX.size)[0]
+        variable = self._variables[index]
+      except (ProtocolError, struct.error, IndexError):
+        self.__drop(client)
+        return
+      try:
+        variable.set_value(value)
+      except Exception:
+        # A value that the Variable or its fset rejects only loses this
+        # write; the client and the other Variables are not affected.
+        pass
+
+  def __drop(self, client):
+    del self._clients[client]
+    del self._outgoing[client]
+    try:
+      client.close()
+    except socket.error:
+      pass
+
+  def __run(self):
+    next_tick = time()
+    new_clients = set()
+    while self.__continue:
+      timeout = max(0.0, next_tick - time())
+      waiting = [c for c, outgoing in self._outgoing.items() if outgoing]
+      readable, writable = select.select([self._socket] +
+          list(self._clients), waiting, [], timeout)[:2]
+      for s in readable:
+        if s is self._socket:
+          client = self._socket.accept()[0]
+          client.setsockopt(socket.IPPROTO_TCP, socket.TCP_NODELAY, 1)
+          client.setblocking(False)
+          self._clients[client] = bytearray()
+          self._outgoing[client] = bytearray()
+          new_clients.add(client)
+        elif s in self._clients:
+          self.__receive(s)
+      for s in writable:
+        if s in self._clients:
+          self.__send(s)
+
+      if time() >= next_tick:
+        self.__tick(new_clients)
+        new_clients = set()
+        next_tick = time() + self._interval
+
+  def __del__(self):
+    self.stop()
+
+
+class VariableClient(object):
+  '''
+  A connection to a wxlive.VariableServer. The Variables that the server
+  publishes are available as wxlive.RemoteVariables through variable().
+  '''
+  def __init__(self, host, port):
+    '''
+    wxlive.VariableClient(host, port)
+
+    Construct a VariableClient for the server at host and port. The
+    connection is made by start().
+    '''
+    self._host = host
+    self._port = port
+    self._lock = Lock()
+    self._socket = None
+    self._indices = {}
+    self._names = {}
+    self._variables = {}
+    self._received = {}
+    self._pending = {}
+    self.__continue = False
+    self.__thread = None
+
+  def variable(self, name, variable_type = float, **kwargs):
+    '''
+    variable(name, variable_type = float, **kwargs)
+
+    Return the wxlive.RemoteVariable for the published Variable with the
+    given name, creating it if necessary. The keyword arguments are passed to
+    wxlive.Variable. A new RemoteVariable starts with the last time and value
+    received for the name, if any.
+    '''
+    with self._lock:
+      variable = self._variables.get(name)
+      if variable is None:
+        variable = RemoteVariable(self, name, variable_type, **kwargs)
+        self._variables[name] = variable
+        sample = self._received.get(name)
+        if sample is not None:
+          try:
+            variable.receive(*sample)
+          except Exception:
+            pass
+    return variable
+
+  def send_value(self, name, value):
+    '''
+    send_value(name, value)
+
+    Ask the server to set the published Variable with the given name. If the
+    name is not in the catalog of the server yet, the value is sent as soon
+    as it is.
+    '''
+    with self._lock:
+      index = self._indices.get(name)
+      if index is None or self._socket is None:
+        self._pending[name] = value
+        return
+      self._socket.sendall(encode_frame(SET,
+          INDEX.pack(index) + encode_value(value)))
+
+  def start(self):
+    '''
+    start()
+
+    Connect to the server and start receiving updates.
+    '''
+    if not self.is_active():
+      self._socket = socket.create_connection((self._host, self._port))
+      self._socket.setsockopt(socket.IPPROTO_TCP, socket.TCP_NODELAY, 1)
+      self._socket.settimeout(0.2)
+      self.__continue = True
+      self.__thread = Thread(target=self.__run)
+      self.__thread.start()
+
+  def stop(self):
+    '''
+    stop()
+
+    Disconnect from the server.
+    '''
+    if self.__thread:
+      self.__continue = False
+      self.__thread.join()
+      self.__thread = None
+      with self._lock:
+        self._socket.close()
+        self._socket = None
+        self._indices = {}
+        self._names = {}
+
+  def is_active(self):
+    '''
+    is_active()
+
+    Returns True if the client has been started.
+    '''
+    return self.__thread is not None
+
+  def is_connected(self):
+    '''
+    is_connected()
+
+    Returns True if the client is started and still receives updates. The
+    connection is lost when the server goes away or sends data that cannot
+    be read; the RemoteVariables then keep their last values.
+    '''
+    return self.__thread is not None and self.__thread.is_alive()
+
+  def __catalog(self, body):
+    names = {}
+    count = COUNT.unpack_from(body, 0)[0]
+    offset = COUNT.size
+    for i in range(count):
+      index = INDEX.unpack_from(body, offset)[0]
+      length = COUNT.unpack_from(body, offset + INDEX.size)[0]
+      offset += INDEX.size + COUNT.size
+      names[body[offset:offset+length].decode('utf-8')] = index
+      offset += length
+
+    with self._lock:
+      self._indices = names
+      self._names = dict((i, n) for n, i in names.items())
+      pending = self._pending
+      self._pending = {}
+    for name, value in pending.items():
+      self.send_value(name, value)
+
+  def __update(self, body):
+    count = COUNT.unpack_from(body, 0)[0]
+    offset = COUNT.size
+    for i in range(count):
+      index = INDEX.unpack_from(body, offset)[0]
+      t = TIME.unpack_from(body, offset + INDEX.size)[0]
+      value, offset = decode_value(body, offset + INDEX.size + TIME.size)
+      if t != t:
+        t = None
+      with self._lock:
+        name = self._names.get(index)
+        if name is None:
+          continue
+        # Kept for RemoteVariables that are made later, see variable().
+        self._received[name] = (t, value)
+        variable = self._variables.get(name)
+      if variable is not None:
+        try:
+          variable.receive(t, value)
+        except Exception:
+          # A value that does not fit the RemoteVariable is skipped.
+          pass
+
+  def __run(self):
+    buf = bytearray()
+    while self.__continue:
+      try:
+        data = self._socket.recv(65536)
+      except socket.timeout:
+        continue
+      except socket.error:
+        break
+      if not data:
+        break
+      buf.extend(data)
+      try:
+        frames = decode_frames(buf)
+      except ProtocolError:
+        # The stream can no longer be split into frames.
+        break
+      for frame_type, body in frames:
+        # A frame that cannot be read is skipped; the frames after it are
+        # still intact.
+        try:
+          if frame_type == CATALOG:
+            self.__catalog(body)
+          elif frame_type == UPDATE:
+            self.__update(body)
+        except (ProtocolError, struct.error, IndexError, UnicodeError):
+          pass
+
+  def __del__(self):
+    self.stop()
+
+
+class RemoteVariable(Variable):
+  '''
+  A wxlive.Variable that mirrors a Variable published by a
+  wxlive.VariableServer. It has no fget or fset of its own: its value and
+  time are those received from the server, and set_value() asks the server
+  to set the published Variable. The new value reaches the listeners once
+  the server sends it back, so unlike with an ordinary Variable, the
+  setter_object is notified as well.
+
+  Use VariableClient.variable() to obtain a RemoteVariable.
+  '''
+  def __init__(self, client, name, variable_type, **kwargs):
+    self._client = client
+    self._name = name
+    Variable.__init__(self, variable_type, None, **kwargs)
+
+  @property
+  def name(self):
+    return self._name
+
+  def set_value(self, value, setter_object=None):
+    '''
+    set_value(value, setter_object = None)
+
+    Coerce the value to the type of the Variable, and send it to the server.
+    '''
+    self._client.send_value(self._name, self.type(value))
+
+  value = property(fget = Variable.get_value, fset = set_value,
+      doc = 'The value of the Variable.')
+
+  def receive(self, time, value):
+    '''
+    receive(time, value)
+
+    Take over a time and value received from the server, and notify the
+    listeners. This is called by the VariableClient.
+    '''
+    if value is not None:
+      value = self.type(value)
+    self._time = time
+    self._value = value
+    self._serial += 1
+    self.notify_listeners()
+
+# vim: set filetype=python shiftwidth=2 softtabstop=2 tabstop=8 expandtab:
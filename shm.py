@@ -0,0 +1,254 @@
+
+import os
+import mmap
+import struct
+import tempfile
+import weakref
+from time import sleep
+from core import Variable
+
+# Layout of a shared Variable table: a header with a magic string and the
+# number of slots, followed by one slot per channel. A slot holds the
+# sequence number, time and value of the channel.
+#
+# The sequence number works as a seqlock: the writer makes it odd before
+# changing the time and value, and even again afterwards. A reader that sees
+# an odd sequence number, or a different one before and after reading the
+# time and value, has seen a partial write and reads again. The number of
+# writes to a slot is thus half its sequence number.
+
+MAGIC = b'WXLVSHM1'
+HEADER = struct.Struct('=8sQ')
+SEQ = struct.Struct('=Q')
+DATA = struct.Struct('=dd')
+SLOT_SIZE = SEQ.size + DATA.size
+
+# Number of times a reader tries to read a slot that is being written. A
+# writer that died halfway through a write leaves the slot busy forever.
+
+READ_TRIES = 1000
+
+
+def shared_memory_path(name):
+  '''
+  wxlive.shm.shared_memory_path(name)
+
+  Return the path of the file that backs the shared Variable table with the
+  given name: a file in /dev/shm where that exists, so that the table lives
+  in memory only, and in the temporary directory otherwise.
+  '''
+  if os.path.isdir('/dev/shm'):
+    return os.path.join('/dev/shm', name)
+  return os.path.join(tempfile.gettempdir(), name)
+
+
+class SharedVariableTable(object):
+  '''
+  A table of (sequence number, time, value) slots of numeric Variables in
+  shared memory, for dashboards that run in several processes on the same
+  host.
+
+  One process, the writer, creates the table and fills the slots with
+  write(), or lets Variables fill them with track(). It must be the only
+  process and thread that writes a slot. Any number of processes attach to
+  the table and read the slots through SharedVariables, see reader().
+  Values are stored as floats; None is stored as NaN.
+  '''
+  def __init__(self, name, count = None):
+    '''
+    wxlive.SharedVariableTable(name, count = None)
+
+    Create the table with the given name and count slots, or, if count is
+    None, attach to an existing table with that name.
+    '''
+    self._name = name
+    self._path = shared_memory_path(name)
+    self._tracked = {}
+    self._last_read = {}
+
+    if count is None:
+      fd = os.open(self._path, os.O_RDWR)
+      try:
+        size = os.fstat(fd).st_size
+        if size < HEADER.size:
+          raise ValueError('%s is not a shared Variable table.' % self._path)
+        self._map = mmap.mmap(fd, size)
+      finally:
+        os.close(fd)
+      magic, count = HEADER.unpack_from(self._map, 0)
+      if magic != MAGIC or size < HEADER.size + count * SLOT_SIZE:
+        self._map.close()
+        raise ValueError('%s is not a shared Variable table.' % self._path)
+    else:
+      self._count = count
+      size = HEADER.size + count * SLOT_SIZE
+      fd = os.open(self._path, os.O_RDWR | os.O_CREAT | os.O_TRUNC, 0o600)
+      try:
+        os.ftruncate(fd, size)
+        self._map = mmap.mmap(fd, size)
+      finally:
+        os.close(fd)
+      nan = float('nan')
+      for index in range(count):
+        DATA.pack_into(self._map, self.__offset(index) + SEQ.size, nan, nan)
+      HEADER.pack_into(self._map, 0, MAGIC, count)
+
+    self._count = count
+
+  @property
+  def name(self):
+    return self._name
+
+  def __len__(self):
+    return self._count
+
+  def __offset(self, index):
+    if not 0 <= index < self._count:
+      raise IndexError('Slot index out of range.')
+    return HEADER.size + index * SLOT_SIZE
+
+  def write(self, index, time, value):
+    '''
+    write(index, time, value)
+
+    Write a time and value into a slot, under the seqlock of that slot.
+    '''
+    if time is None:
+      time = float('nan')
+    if value is None:
+      value = float('nan')
+    offset = self.__offset(index)
+    seq = SEQ.unpack_from(self._map, offset)[0]
+    SEQ.pack_into(self._map, offset, seq + 1)
+    DATA.pack_into(self._map, offset + SEQ.size, time, value)
+    SEQ.pack_into(self._map, offset, seq + 2)
+
+  def read(self, index):
+    '''
+    read(index)
+
+    Read a slot directly from shared memory, and return its sequence number,
+    time and value. A sequence number of 0 means that the slot has never
+    been written. If the slot stays busy for READ_TRIES attempts, e.g.
+    because the writer died during a write, the last slot read by this
+    table is returned instead.
+    '''
+    offset = self.__offset(index)
+    for i in range(READ_TRIES):
+      seq = SEQ.unpack_from(self._map, offset)[0]
+      if not seq & 1:
+        time, value = DATA.unpack_from(self._map, offset + SEQ.size)
+        if SEQ.unpack_from(self._map, offset)[0] == seq:
+          self._last_read[index] = (seq, time, value)
+          return seq, time, value
+      sleep(0)
+    return self._last_read.get(index, (0, float('nan'), float('nan')))
+
+  def track(self, index, variable):
+    '''
+    track(index, variable)
+
+    Write the time and value of a wxlive.Variable into a slot every time the
+    Variable notifies its listeners, starting with its current value. Only
+    use this in the writing process. The Variable only refers weakly to the
+    table.
+    '''
+    self.untrack(index)
+    # The table holds the Variable, so the callback must not hold the table:
+    # the cycle would keep both alive, as the Variable has a __del__.
+    table = weakref.ref(self)
+    def write(time, value, samples):
+      self = table()
+      if self is not None:
+        self.write(index, time, value)
+    self._tracked[index] = (variable, write)
+    variable.add_callback(write)
+    self.write(index, variable.get_time(), variable._value)
+
+  def untrack(self, index):
+    '''
+    untrack(index)
+
+    Stop writing the Variable tracked by a slot.
+    '''
+    if index in self._tracked:
+      variable, write = self._tracked.pop(index)
+      variable.remove_callback(write)
+
+  def reader(self, index, variable_type = float, **kwargs):
+    '''
+    reader(index, variable_type = float, **kwargs)
+
+    Return a wxlive.SharedVariable that reads the given slot. The keyword
+    arguments are passed to wxlive.Variable.
+    '''
+    return SharedVariable(self, index, variable_type, **kwargs)
+
+  def close(self):
+    '''
+    close()
+
+    Detach from the table. The table itself remains until unlink() is
+    called.
+    '''
+    for index in list(self._tracked):
+      self.untrack(index)
+    if self._map is not None:
+      self._map.close()
+      self._map = None
+
+  def unlink(self):
+    '''
+    unlink()
+
+    Remove the table, usually done by the writer at the end. Processes that
+    are attached can still use it until they close() it.
+    '''
+    try:
+      os.unlink(self._path)
+    except OSError:
+      pass
+
+
+class SharedVariable(Variable):
+  '''
+  A read-only wxlive.Variable that reads its time and value from a slot of
+  a wxlive.SharedVariableTable. Every update() reads the slot, and only
+  notifies the listeners if the sequence number of the slot changed, i.e.
+  if the writer wrote a new value. Like any Variable, it can be start()-ed
+  or put in a wxlive.VariableList to be updated automatically.
+
+  Use SharedVariableTable.reader() to obtain a SharedVariable.
+  '''
+  def __init__(self, table, index, variable_type = float, **kwargs):
+    self._table = table
+    self._index = index
+    self._seq = 0
+    Variable.__init__(self, variable_type, None, **kwargs)
+
+  @property
+  def seq(self):
+    return self._seq
+
+  def update(self):
+    '''
+    update()
+
+    Read the slot, and notify the listeners if it was written since the
+    previous update(). A time or value stored as NaN is read as None.
+    '''
+    seq, time, value = self._table.read(self._index)
+    if seq != self._seq:
+      self._seq = seq
+      self._time = None if time != time else time
+      self._value = None if value != value else self.type(value)
+      self._serial += 1
+      self.notify_listeners()
+
+  def set_value(self, value, setter_object=None):
+    raise TypeError('A SharedVariable is read-only.')
+
+  value = property(fget = Variable.get_value, fset = set_value,
+      doc = 'The value of the Variable.')
+
+# vim: set filetype=python shiftwidth=2 softtabstop=2 tabstop=8 expandtab:
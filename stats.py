@@ -0,0 +1,267 @@
+
+from abc import ABCMeta, abstractmethod
+from collections import deque
+from math import exp, sqrt
+from core import Variable
+
+
+class StatisticVariable(Variable):
+  '''
+  A wxlive.Variable whose value is a statistic of the values of a source
+  Variable. Every value of the source, including every sample pushed into
+  it (see Variable.push()), is fed into the statistic as soon as the source
+  notifies its listeners, and the statistic then notifies its own listeners.
+  A StatisticVariable can be used like any other Variable, e.g. plotted
+  with axes_plot().
+
+  A source also notifies its listeners when it took nothing new, e.g.
+  whenever an inactive source is read. Such notifications are recognised by
+  the serial of the source (see Variable.get_serial()), and skipped.
+
+  The source only refers weakly to the statistic: keep a reference to the
+  statistic for as long as it is used. The statistic is a consumer of the
+  source (see Variable.add_consumer()), so that the source is hidden when
+  nothing shows the statistic.
+
+  Subclasses implement feed(time, value) and result().
+  '''
+  __metaclass__ = ABCMeta
+
+  def __init__(self, source, **kwargs):
+    '''
+    StatisticVariable(source, **kwargs)
+
+    Attach a statistic to the source wxlive.Variable, starting with its
+    current value. The keyword arguments are passed to wxlive.Variable.
+    '''
+    self._source = source
+    self._last_serial = None
+    Variable.__init__(self, float, None, **kwargs)
+    self._callback = source.add_weak_callback(self.__on_source)
+    source.add_consumer(self)
+    if source._value is not None:
+      self.__on_source(source.get_time(), source._value, None)
+
+  @property
+  def source(self):
+    return self._source
+
+  def detach(self):
+    '''
+    detach()
+
+    Stop following the source Variable.
+    '''
+    self._source.remove_callback(self._callback)
+    self._source.remove_consumer(self)
+
+  def __on_source(self, time, value, samples):
+    serial = self._source._serial
+    if serial == self._last_serial:
+      return
+    self._last_serial = serial
+    if samples is None:
+      samples = [(time, value)]
+    for t, v in samples:
+      if v is not None:
+        self.feed(t, float(v))
+    self._time = time
+    self._value = self.result()
+    self._serial += 1
+    self.notify_listeners()
+
+  @abstractmethod
+  def feed(self, time, value):
+    '''Take a new sample into the statistic.'''
+
+  @abstractmethod
+  def result(self):
+    '''Return the value of the statistic, or None if it has none.'''
+
+
+class WindowStatistic(StatisticVariable):
+  '''
+  A statistic over a sliding window of the most recent values of the
+  source, limited either to a number of samples (size) or to the samples of
+  the last duration seconds. Subclasses implement add(value) and
+  remove(value), which are called as values enter and leave the window,
+  and result().
+  '''
+  def __init__(self, source, size = None, duration = None, **kwargs):
+    '''
+    WindowStatistic(source, size = None, duration = None, **kwargs)
+
+    Attach a statistic over a window of size samples, or of duration
+    seconds, to the source wxlive.Variable.
+    '''
+    if (size is None) == (duration is None):
+      raise ValueError('Give either a size or a duration.')
+    if size is not None and size < 1:
+      raise ValueError('Window size must be at least 1.')
+    self._size = size
+    self._duration = duration
+    self._window = deque()
+    StatisticVariable.__init__(self, source, **kwargs)
+
+  @property
+  def count(self):
+    '''The number of samples in the window.'''
+    return len(self._window)
+
+  def feed(self, time, value):
+    self._window.append((time, value))
+    self.add(value)
+    if self._size is not None:
+      while len(self._window) > self._size:
+        self.remove(self._window.popleft()[1])
+    elif time is not None:
+      # Samples from before a jump back in time, e.g. after the source's
+      # reset_time_offset(), have left the window as well.
+      while self._window[0][0] is not None and \
+          not 0 <= time - self._window[0][0] <= self._duration:
+        self.remove(self._window.popleft()[1])
+
+  @abstractmethod
+  def add(self, value):
+    '''Take a value that enters the window into the statistic.'''
+
+  @abstractmethod
+  def remove(self, value):
+    '''Take a value that leaves the window out of the statistic.'''
+
+
+class RollingMean(WindowStatistic):
+  '''
+  The mean of a sliding window of values, updated in constant time per
+  sample with Welford's algorithm.
+  '''
+  def __init__(self, source, size = None, duration = None, **kwargs):
+    self._n = 0
+    self._mean = 0.0
+    self._m2 = 0.0
+    WindowStatistic.__init__(self, source, size, duration, **kwargs)
+
+  def add(self, value):
+    self._n += 1
+    delta = value - self._mean
+    self._mean += delta / self._n
+    self._m2 += delta * (value - self._mean)
+
+  def remove(self, value):
+    self._n -= 1
+    if self._n == 0:
+      self._mean = 0.0
+      self._m2 = 0.0
+    else:
+      delta = value - self._mean
+      self._mean -= delta / self._n
+      self._m2 = max(0.0, self._m2 - delta * (value - self._mean))
+
+  def result(self):
+    if self._n == 0:
+      return None
+    return self._mean
+
+
+class RollingStd(RollingMean):
+  '''
+  The standard deviation of a sliding window of values, updated in constant
+  time per sample with Welford's algorithm. With ddof = 1, the sample
+  standard deviation is given instead of the population standard
+  deviation.
+  '''
+  def __init__(self, source, size = None, duration = None, ddof = 0,
+      **kwargs):
+    self._ddof = ddof
+    RollingMean.__init__(self, source, size, duration, **kwargs)
+
+  def result(self):
+    if self._n <= self._ddof:
+      return None
+    return sqrt(self._m2 / (self._n - self._ddof))
+
+
+class RollingMin(WindowStatistic):
+  '''
+  The minimum of a sliding window of values, updated in amortised constant
+  time per sample with a monotonic deque.
+  '''
+  def __init__(self, source, size = None, duration = None, **kwargs):
+    self._candidates = deque()
+    self._added = 0
+    self._removed = 0
+    WindowStatistic.__init__(self, source, size, duration, **kwargs)
+
+  def better(self, a, b):
+    return a <= b
+
+  def add(self, value):
+    while self._candidates and self.better(value, self._candidates[-1][1]):
+      self._candidates.pop()
+    self._candidates.append((self._added, value))
+    self._added += 1
+
+  def remove(self, value):
+    if self._candidates and self._candidates[0][0] == self._removed:
+      self._candidates.popleft()
+    self._removed += 1
+
+  def result(self):
+    if not self._candidates:
+      return None
+    return self._candidates[0][1]
+
+
+class RollingMax(RollingMin):
+  '''
+  The maximum of a sliding window of values, updated in amortised constant
+  time per sample with a monotonic deque.
+  '''
+  def better(self, a, b):
+    return a >= b
+
+
+class ExponentialMean(StatisticVariable):
+  '''
+  An exponentially weighted moving average. With time_constant, a sample
+  that arrives dt seconds after the previous one gets weight
+  1 - exp(-dt / time_constant), so that the decay does not depend on the
+  sample rate. With alpha, every sample gets weight alpha.
+  '''
+  def __init__(self, source, time_constant = None, alpha = None, **kwargs):
+    '''
+    ExponentialMean(source, time_constant = None, alpha = None, **kwargs)
+
+    Attach an exponentially weighted moving average to the source
+    wxlive.Variable. Give either time_constant (in seconds) or alpha.
+    '''
+    if (time_constant is None) == (alpha is None):
+      raise ValueError('Give either a time constant or an alpha.')
+    if alpha is not None and not 0 < alpha <= 1:
+      raise ValueError('Alpha must be between 0 and 1.')
+    if time_constant is not None and time_constant <= 0:
+      raise ValueError('Time constant must be positive.')
+    self._time_constant = time_constant
+    self._alpha = alpha
+    self._mean = None
+    self._last_time = None
+    StatisticVariable.__init__(self, source, **kwargs)
+
+  def feed(self, time, value):
+    if self._mean is None:
+      self._mean = value
+    else:
+      if self._alpha is not None:
+        weight = self._alpha
+      elif time is None or self._last_time is None:
+        weight = 1.0
+      else:
+        weight = 1.0 - exp(-max(0.0, time - self._last_time) /
+            self._time_constant)
+      self._mean += weight * (value - self._mean)
+    self._last_time = time
+
+  def result(self):
+    return self._mean
+
+# vim: set filetype=python shiftwidth=2 softtabstop=2 tabstop=8 expandtab:
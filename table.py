@@ -0,0 +1,326 @@
+
+import numpy
+from core import Variable
+from clock import get_clock
+
+
+class VariableTable(object):
+  '''
+  A table of many numeric channels, stored column-wise in NumPy arrays of
+  values, timestamps and sequence numbers, for when there are too many
+  channels to give each its own wxlive.Variable.
+
+  The table is updated as a whole: a single call of fget returns the values
+  of all channels at once. Channels whose value changed get a new sequence
+  number. Individual channels are available as wxlive.ChannelViews through
+  channel(), which act like Variables towards widgets and axes_plot(). A view
+  is only created when it is asked for, so channels that nobody watches do
+  not cost more than their slots in the arrays.
+  '''
+  def __init__(self, count, fget = None, fset = None, interval = 1.0,
+      names = None):
+    '''
+    wxlive.VariableTable(count, fget = None, fset = None, interval = 1.0,
+      names = None)
+
+    Construct a VariableTable of count channels. Updating is not started yet.
+
+    Keyword arguments:
+    count     The number of channels.
+    fget      A function that is called without arguments, and returns a
+              sequence of count numbers: the values of all channels.
+    fset      A function that is called with a channel index and a new value
+              for that channel. See method set_value().
+    interval  The interval in seconds at which to update the table when it
+              is start()-ed.
+    names     An optional sequence of count names, so that channels can also
+              be looked up by name.
+    '''
+    self.__thread = None
+    self.__continue = False
+
+    self._values = numpy.empty(count)
+    self._values.fill(numpy.nan)
+    self._times = numpy.empty(count)
+    self._times.fill(numpy.nan)
+    self._seqs = numpy.zeros(count, dtype=numpy.uint64)
+    self._views = {}
+    self._time_offset = 0.0
+    self._interval = float(interval)
+
+    self._names = {}
+    if names is not None:
+      if len(names) != count:
+        raise ValueError('Need exactly one name per channel.')
+      for index, name in enumerate(names):
+        self._names[name] = index
+
+    self.fget = fget
+    self.fset = fset
+
+  def __len__(self):
+    return len(self._values)
+
+  @property
+  def values(self):
+    '''The values of all channels. Do not modify this array.'''
+    return self._values
+
+  @property
+  def times(self):
+    '''The timestamps of all channels. Do not modify this array.'''
+    return self._times
+
+  @property
+  def seqs(self):
+    '''The sequence numbers of all channels, i.e. the number of times each
+    channel changed. Do not modify this array.'''
+    return self._seqs
+
+  def get_interval(self):
+    '''
+    get_interval()
+
+    Return the currently set interval at wich to do automatic updating.
+    '''
+    return self._interval
+
+  def set_interval(self, value):
+    '''
+    set_interval(value)
+
+    Set the interval at which to do automatic updating.
+    '''
+    self._interval = float(value)
+
+  interval = property(fget = get_interval, fset = set_interval,
+      doc = 'The interval at which to do automatic updating.')
+
+  def get_time_offset(self):
+    '''
+    get_time_offset()
+    '''
+    return self._time_offset
+
+  def set_time_offset(self, value):
+    '''
+    set_time_offset(value)
+    '''
+    if value == 'now':
+      value = get_clock().time()
+    elif type(value) != float and type(value) != int:
+      raise TypeError('Time offset can only be a real number.')
+
+    self._time_offset = float(value)
+
+  time_offset = property(fget = get_time_offset, fset = set_time_offset)
+
+  def index(self, key):
+    '''
+    index(key)
+
+    Return the index of a channel, given its index or its name.
+    '''
+    if key in self._names:
+      return self._names[key]
+    index = int(key)
+    if not 0 <= index < len(self._values):
+      raise IndexError('Channel index out of range.')
+    return index
+
+  def channel(self, key):
+    '''
+    channel(key)
+
+    Return the wxlive.ChannelView of a channel, given its index or its
+    name. Asking for the same channel twice gives the same view.
+    '''
+    index = self.index(key)
+    view = self._views.get(index)
+    if view is None:
+      view = ChannelView(self, index)
+      self._views[index] = view
+    return view
+
+  __getitem__ = channel
+
+  def update(self):
+    '''
+    update()
+
+    Update all channels with a single call of fget, and let the views of the
+    channels whose value changed notify their listeners.
+    '''
+    if self.fget is None:
+      return
+    values = numpy.asarray(self.fget(), dtype=self._values.dtype)
+    if values.shape != self._values.shape:
+      raise ValueError('fget must return exactly one value per channel.')
+
+    changed = values != self._values
+    changed &= ~(numpy.isnan(values) & numpy.isnan(self._values))
+    self._times.fill(get_clock().time() - self._time_offset)
+    self._values[:] = values
+    self._seqs[changed] += 1
+
+    for index, view in list(self._views.items()):
+      if changed[index]:
+        view.update()
+
+  def set_value(self, key, value, setter_object = None):
+    '''
+    set_value(key, value, setter_object = None)
+
+    Set the value of a channel, given its index or name. If fset is defined,
+    it is called with the index and the value, and its reply becomes the
+    reply of the ChannelView. See also wxlive.Variable.set_value().
+    '''
+    index = self.index(key)
+    value = float(value)
+    reply = None
+    if self.fset is not None:
+      reply = self.fset(index, value)
+    self._times[index] = get_clock().time() - self._time_offset
+    self._values[index] = value
+    self._seqs[index] += 1
+
+    view = self._views.get(index)
+    if view is not None:
+      view._reply = reply
+      view.update(skip_listener = setter_object)
+
+  def start(self, interval = None):
+    '''
+    start(interval = None)
+
+    Start updating the table. If no interval in seconds is given, the
+    interval attribute of the table is used.
+    '''
+    if interval is not None:
+      self.interval = float(interval)
+
+    if not self.is_active():
+      self.__continue = True
+      self.__thread = get_clock().start_thread(self.__run)
+
+  def stop(self):
+    '''
+    stop()
+
+    Stop updating the table.
+    '''
+    if self.__thread:
+      self.__continue = False
+      get_clock().wake(self.__thread)
+      self.__thread.join()
+      self.__thread = None
+
+  def is_active(self):
+    '''
+    is_active()
+
+    Predicate to see if the table is start()-ed.
+    '''
+    return self.__thread is not None
+
+  def __run(self):
+    while self.__continue:
+      self.update()
+      if self._interval:
+        get_clock().sleep(self._interval)
+
+  def __del__(self):
+    self.stop()
+
+
+class ChannelView(Variable):
+  '''
+  A view of one channel of a wxlive.VariableTable, which acts like a
+  wxlive.Variable towards widgets and axes_plot(). Its value and time are
+  read from the table.
+
+  A ChannelView does not poll by itself: reading its value returns the
+  value from the last update of the table, unless a forced update is asked
+  for with get_value(force = True), which updates the whole table.
+
+  Use VariableTable.channel() to obtain a ChannelView.
+  '''
+  def __init__(self, table, index):
+    self._table = table
+    self._index = index
+    Variable.__init__(self, float, None)
+    self._time = self.get_time()
+    self._value = self.get_value()
+
+  @property
+  def table(self):
+    return self._table
+
+  @property
+  def index(self):
+    return self._index
+
+  @property
+  def seq(self):
+    return int(self._table._seqs[self._index])
+
+  def update(self, skip_listener = None):
+    '''
+    update()
+
+    Take over the time and value of the channel from the table, and notify
+    the listeners.
+    '''
+    t = self._table._times[self._index]
+    self._time = None if numpy.isnan(t) else float(t)
+    self._value = float(self._table._values[self._index])
+    self._serial += 1
+    self.notify_listeners(skip_listener = skip_listener)
+
+  def get_value(self, force = False):
+    '''
+    get_value(force = False)
+
+    Return the value of the channel. If force is True, the whole table is
+    updated first.
+    '''
+    if force:
+      self._table.update()
+    return float(self._table._values[self._index])
+
+  def get_time(self):
+    '''
+    get_time()
+
+    Return the timestamp of the channel.
+    '''
+    t = self._table._times[self._index]
+    return None if numpy.isnan(t) else float(t)
+
+  time = property(fget = get_time)
+
+  def get_time_value_pair(self, force = False):
+    if force:
+      self._table.update()
+    return (self.get_time(), float(self._table._values[self._index]))
+
+  def set_value(self, value, setter_object=None):
+    '''
+    set_value(value, setter_object = None)
+
+    Set the value of the channel, see VariableTable.set_value().
+    '''
+    self._table.set_value(self._index, value, setter_object)
+
+  value = property(fget = get_value, fset = set_value,
+      doc = 'The value of the channel.')
+
+  def is_active(self):
+    '''
+    is_active()
+
+    Returns True if the table is start()-ed.
+    '''
+    return self._table.is_active()
+
+# vim: set filetype=python shiftwidth=2 softtabstop=2 tabstop=8 expandtab: